@@ -8,8 +8,12 @@ from alembic import context
 
 from models.base import Base
 from models.companies import Companies
+from models.data_version import DataVersion
 from models.etl_config import EtlStatus
 from models.jobs import Jobs
+from models.job_daily_rollup import JobDailyRollup
+from models.job_first_seen import JobFirstSeen
+from models.kpi_summary import KpiSummary
 from models.search_history import SearchHistory
 from models.staging_jobs import StagingJobs
 from models.staging_companies import StagingCompanies
@@ -0,0 +1,34 @@
+"""adding lk_jobs indexes for dashboard queries
+
+Revision ID: 2c7f5b8e1a94
+Revises: d41b7e9a2f60
+Create Date: 2026-10-18 18:06:12.554190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2c7f5b8e1a94'
+down_revision: Union[str, Sequence[str], None] = 'd41b7e9a2f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_lk_jobs_last_updated_job_id', 'lk_jobs', ['last_updated', 'job_id'], unique=False)
+    op.create_index('ix_lk_jobs_etl_id_last_updated', 'lk_jobs', ['etl_id', 'last_updated'], unique=False)
+    op.create_index('ix_lk_jobs_company_id_last_updated', 'lk_jobs', ['company_id', 'last_updated'], unique=False)
+    op.create_index('ix_lk_jobs_job_experience_level_last_updated', 'lk_jobs', ['job_experience_level', 'last_updated'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_lk_jobs_job_experience_level_last_updated', table_name='lk_jobs')
+    op.drop_index('ix_lk_jobs_company_id_last_updated', table_name='lk_jobs')
+    op.drop_index('ix_lk_jobs_etl_id_last_updated', table_name='lk_jobs')
+    op.drop_index('ix_lk_jobs_last_updated_job_id', table_name='lk_jobs')
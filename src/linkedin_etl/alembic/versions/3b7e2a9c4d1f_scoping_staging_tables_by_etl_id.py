@@ -0,0 +1,47 @@
+"""scoping staging tables by etl id
+
+Revision ID: 3b7e2a9c4d1f
+Revises: 91f4d98615f4
+Create Date: 2026-10-18 10:12:31.482917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e2a9c4d1f'
+down_revision: Union[str, Sequence[str], None] = '91f4d98615f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Staging rows are transient; clearing them avoids back-filling an etl_id for stale rows
+    op.execute("TRUNCATE TABLE lk_staging_job_details")
+    op.execute("TRUNCATE TABLE lk_staging_companies")
+
+    op.add_column('lk_staging_job_details', sa.Column('etl_id', sa.Integer(), nullable=False))
+    op.drop_constraint('PRIMARY', 'lk_staging_job_details', type_='primary')
+    op.create_primary_key('pk_lk_staging_job_details', 'lk_staging_job_details', ['job_id', 'etl_id'])
+
+    op.add_column('lk_staging_companies', sa.Column('etl_id', sa.Integer(), nullable=False))
+    op.drop_constraint('PRIMARY', 'lk_staging_companies', type_='primary')
+    op.create_primary_key('pk_lk_staging_companies', 'lk_staging_companies', ['company_id', 'etl_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("TRUNCATE TABLE lk_staging_job_details")
+    op.execute("TRUNCATE TABLE lk_staging_companies")
+
+    op.drop_constraint('PRIMARY', 'lk_staging_companies', type_='primary')
+    op.drop_column('lk_staging_companies', 'etl_id')
+    op.create_primary_key('pk_lk_staging_companies', 'lk_staging_companies', ['company_id'])
+
+    op.drop_constraint('PRIMARY', 'lk_staging_job_details', type_='primary')
+    op.drop_column('lk_staging_job_details', 'etl_id')
+    op.create_primary_key('pk_lk_staging_job_details', 'lk_staging_job_details', ['job_id'])
@@ -0,0 +1,32 @@
+"""adding content hash to companies
+
+Revision ID: 5e1c8d0a7b42
+Revises: 3b7e2a9c4d1f
+Create Date: 2026-10-18 11:02:47.150392
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e1c8d0a7b42'
+down_revision: Union[str, Sequence[str], None] = '3b7e2a9c4d1f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows keep a NULL hash and are rewritten in full the next time they are merged.
+    # Jobs have no hash: only ids missing from lk_jobs are fetched, so staged jobs are new anyway
+    op.add_column('lk_companies', sa.Column('content_hash', sa.CHAR(length=32), nullable=True))
+    op.add_column('lk_staging_companies', sa.Column('content_hash', sa.CHAR(length=32), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('lk_staging_companies', 'content_hash')
+    op.drop_column('lk_companies', 'content_hash')
@@ -0,0 +1,37 @@
+"""adding fulltext search index on lk_jobs
+
+Revision ID: 6f3a9d2c8b15
+Revises: 2c7f5b8e1a94
+Create Date: 2026-10-18 18:31:47.902316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6f3a9d2c8b15'
+down_revision: Union[str, Sequence[str], None] = '2c7f5b8e1a94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Token size comes from the server's ngram_token_size (default 2). The default InnoDB
+    # stopwords ("a", "i", "in", ...) would drop every n-gram containing them, so the index is
+    # built without stopwords; the setting is read once, when the index is created
+    op.execute("SET @previous_ft_enable_stopword = @@SESSION.innodb_ft_enable_stopword")
+    op.execute("SET SESSION innodb_ft_enable_stopword = OFF")
+    op.execute(
+        "CREATE FULLTEXT INDEX ft_lk_jobs_search "
+        "ON lk_jobs (standardized_name, job_name, job_description) WITH PARSER ngram"
+    )
+    op.execute("SET SESSION innodb_ft_enable_stopword = @previous_ft_enable_stopword")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ft_lk_jobs_search', table_name='lk_jobs')
@@ -0,0 +1,58 @@
+"""adding daily rollup table for search trends
+
+Revision ID: 8a4f6c2e9d13
+Revises: 5e1c8d0a7b42
+Create Date: 2026-10-18 12:20:05.611853
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a4f6c2e9d13'
+down_revision: Union[str, Sequence[str], None] = '5e1c8d0a7b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('lk_job_daily_rollup',
+    sa.Column('rollup_date', sa.Date(), nullable=False),
+    sa.Column('etl_id', sa.Integer(), nullable=False),
+    sa.Column('city', sa.String(length=255), nullable=False, server_default=''),
+    sa.Column('job_experience_level', sa.String(length=255), nullable=False, server_default=''),
+    sa.Column('country', sa.String(length=255), nullable=True),
+    sa.Column('job_count', sa.Integer(), nullable=False),
+    sa.Column('new_jobs', sa.Integer(), nullable=False),
+    sa.Column('updated_jobs', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('rollup_date', 'etl_id', 'city', 'job_experience_level')
+    )
+
+    # Backfill the whole history once, the ETL keeps it up to date afterwards
+    op.execute("""
+        INSERT INTO lk_job_daily_rollup (
+            rollup_date, etl_id, city, job_experience_level, country, job_count, new_jobs, updated_jobs
+        )
+        SELECT
+            DATE(j.last_updated),
+            COALESCE(j.etl_id, 0),
+            COALESCE(s.city, ''),
+            COALESCE(j.job_experience_level, ''),
+            MAX(s.country),
+            COUNT(*),
+            SUM(DATE(COALESCE(j.created_at, j.last_updated)) = DATE(j.last_updated)),
+            SUM(DATE(COALESCE(j.created_at, j.last_updated)) < DATE(j.last_updated))
+        FROM lk_jobs j
+        LEFT JOIN lk_etl_status s ON s.etl_id = j.etl_id
+        WHERE j.last_updated IS NOT NULL
+        GROUP BY DATE(j.last_updated), COALESCE(j.etl_id, 0), COALESCE(s.city, ''), COALESCE(j.job_experience_level, '')
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('lk_job_daily_rollup')
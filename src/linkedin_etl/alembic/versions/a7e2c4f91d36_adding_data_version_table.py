@@ -0,0 +1,34 @@
+"""adding data version table
+
+Revision ID: a7e2c4f91d36
+Revises: 6f3a9d2c8b15
+Create Date: 2026-10-18 18:44:09.317522
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7e2c4f91d36'
+down_revision: Union[str, Sequence[str], None] = '6f3a9d2c8b15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('lk_data_version',
+    sa.Column('version', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('published_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+    sa.PrimaryKeyConstraint('version')
+    )
+    # Dashboards always find a version to key their cache on
+    op.execute("INSERT INTO lk_data_version (published_at) VALUES (NOW())")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('lk_data_version')
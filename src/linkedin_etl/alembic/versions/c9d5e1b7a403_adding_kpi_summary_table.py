@@ -0,0 +1,80 @@
+"""adding kpi summary table
+
+Revision ID: c9d5e1b7a403
+Revises: a7e2c4f91d36
+Create Date: 2026-10-18 18:58:26.440981
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9d5e1b7a403'
+down_revision: Union[str, Sequence[str], None] = 'a7e2c4f91d36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('lk_kpi_summary',
+    sa.Column('summary_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('last_load_ts', sa.DateTime(), nullable=True),
+    sa.Column('total_jobs', sa.BigInteger(), nullable=True),
+    sa.Column('jobs_last_load', sa.BigInteger(), nullable=True),
+    sa.Column('companies_last_load', sa.BigInteger(), nullable=True),
+    sa.Column('job_name_completeness', sa.DECIMAL(precision=7, scale=6), nullable=True),
+    sa.Column('job_url_completeness', sa.DECIMAL(precision=7, scale=6), nullable=True),
+    sa.Column('company_id_completeness', sa.DECIMAL(precision=7, scale=6), nullable=True),
+    sa.Column('job_description_completeness', sa.DECIMAL(precision=7, scale=6), nullable=True),
+    sa.Column('refreshed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('summary_id')
+    )
+
+    # Same statement as database/rollups.py::refresh_kpi_summary
+    op.execute("""
+        INSERT INTO lk_kpi_summary (
+            summary_id,
+            last_load_ts,
+            total_jobs,
+            jobs_last_load,
+            companies_last_load,
+            job_name_completeness,
+            job_url_completeness,
+            company_id_completeness,
+            job_description_completeness,
+            refreshed_at
+        )
+        SELECT
+            1,
+            m.last_ts,
+            COUNT(*),
+            SUM(j.last_updated = m.last_ts),
+            COUNT(DISTINCT CASE WHEN j.last_updated = m.last_ts THEN j.company_id END),
+            AVG(j.job_name IS NOT NULL),
+            AVG(j.job_url IS NOT NULL),
+            AVG(j.company_id IS NOT NULL),
+            AVG(j.job_description IS NOT NULL),
+            NOW()
+        FROM lk_jobs j
+        CROSS JOIN (SELECT MAX(last_updated) AS last_ts FROM lk_jobs) m
+        GROUP BY m.last_ts
+        ON DUPLICATE KEY UPDATE
+            last_load_ts = VALUES(last_load_ts),
+            total_jobs = VALUES(total_jobs),
+            jobs_last_load = VALUES(jobs_last_load),
+            companies_last_load = VALUES(companies_last_load),
+            job_name_completeness = VALUES(job_name_completeness),
+            job_url_completeness = VALUES(job_url_completeness),
+            company_id_completeness = VALUES(company_id_completeness),
+            job_description_completeness = VALUES(job_description_completeness),
+            refreshed_at = VALUES(refreshed_at)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('lk_kpi_summary')
@@ -0,0 +1,65 @@
+"""adding job first seen table
+
+Revision ID: d41b7e9a2f60
+Revises: 8a4f6c2e9d13
+Create Date: 2026-10-18 17:55:41.208736
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41b7e9a2f60'
+down_revision: Union[str, Sequence[str], None] = '8a4f6c2e9d13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('lk_job_first_seen',
+    sa.Column('job_id', sa.BigInteger(), nullable=False),
+    sa.Column('first_seen_date', sa.Date(), nullable=False),
+    sa.PrimaryKeyConstraint('job_id')
+    )
+
+    op.execute("""
+        INSERT INTO lk_job_first_seen (job_id, first_seen_date)
+        SELECT job_id, DATE(COALESCE(created_at, last_updated))
+        FROM lk_jobs
+        WHERE COALESCE(created_at, last_updated) IS NOT NULL
+    """)
+
+    # Recompute the rollup split against the new table so history and new runs agree
+    op.execute("""
+        UPDATE lk_job_daily_rollup r
+        JOIN (
+            SELECT
+                DATE(j.last_updated) AS rollup_date,
+                COALESCE(j.etl_id, 0) AS etl_id,
+                COALESCE(s.city, '') AS city,
+                COALESCE(j.job_experience_level, '') AS job_experience_level,
+                SUM(fs.first_seen_date = DATE(j.last_updated)) AS new_jobs,
+                SUM(fs.first_seen_date < DATE(j.last_updated)) AS updated_jobs
+            FROM lk_jobs j
+            JOIN lk_job_first_seen fs ON fs.job_id = j.job_id
+            LEFT JOIN lk_etl_status s ON s.etl_id = j.etl_id
+            WHERE j.last_updated IS NOT NULL
+            GROUP BY DATE(j.last_updated), COALESCE(j.etl_id, 0), COALESCE(s.city, ''), COALESCE(j.job_experience_level, '')
+        ) fs_split
+          ON fs_split.rollup_date = r.rollup_date
+         AND fs_split.etl_id = r.etl_id
+         AND fs_split.city = r.city
+         AND fs_split.job_experience_level = r.job_experience_level
+        SET
+            r.new_jobs = fs_split.new_jobs,
+            r.updated_jobs = fs_split.updated_jobs
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('lk_job_first_seen')
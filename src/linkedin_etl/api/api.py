@@ -1,21 +1,86 @@
-import time
+import json
 import os
-from requests import get, HTTPError
+import time
+from requests import Session, HTTPError
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
 
-DETAIL_URL = "https://www.linkedin.com/voyager/api/jobs/jobPostings/job_id?decorationId=com.linkedin.voyager.deco.jobs.web.shared.WebFullJobPosting-65&topN=1&topNRequestedFlavors=List(TOP_APPLICANT,IN_NETWORK,COMPANY_RECRUIT,SCHOOL_RECRUIT,HIDDEN_GEM,ACTIVELY_HIRING_COMPANY)"
+from api.rate_limiter import RATE_LIMITERS
+from api.voyager_records import FAST_JSON_DECODER, decode_job_posting
+from utils.metrics import METRICS
+
+try:
+    import brotli  # noqa: F401  urllib3 only decodes "br" when a brotli package is installed
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+# Overridable so benchmarks can point the pipeline at benchmarks/fake_linkedin_api.py
+LINKEDIN_BASE_URL = os.environ.get("LINKEDIN_BASE_URL", "https://www.linkedin.com")
+
+DETAIL_URL = f"{LINKEDIN_BASE_URL}/voyager/api/jobs/jobPostings/job_id?decorationId=com.linkedin.voyager.deco.jobs.web.shared.WebFullJobPosting-65&topN=1&topNRequestedFlavors=List(TOP_APPLICANT,IN_NETWORK,COMPANY_RECRUIT,SCHOOL_RECRUIT,HIDDEN_GEM,ACTIVELY_HIRING_COMPANY)"
 
 HEADERS = {
     'Cookie' : os.environ.get("cookie"),
-    'Csrf-Token' : os.environ.get("csfrtoken")
+    'Csrf-Token' : os.environ.get("csfrtoken"),
+    'Accept-Encoding' : ACCEPT_ENCODING,
 }
 
-def get_request(url, delay=1):
+HTTP_POOL_SIZE = int(os.environ.get("HTTP_POOL_SIZE", 10))
+HTTP_MAX_RETRIES = int(os.environ.get("HTTP_MAX_RETRIES", 5))
+HTTP_BACKOFF_FACTOR = float(os.environ.get("HTTP_BACKOFF_FACTOR", 2))
+HTTP_TIMEOUT = float(os.environ.get("HTTP_TIMEOUT", 30))
+
+# Detail responses go through msgspec/orjson when installed, FAST_JSON=0 forces the json path
+FAST_JSON = os.environ.get("FAST_JSON", "1") == "1" and FAST_JSON_DECODER is not None
+
+def create_session():
+    retry = Retry(
+        total=HTTP_MAX_RETRIES,
+        backoff_factor=HTTP_BACKOFF_FACTOR,
+        status_forcelist=(429, 500, 502, 503, 504, 999),
+        allowed_methods=frozenset({"GET"}),
+        respect_retry_after_header=True,
+        # Hand the final response back so raise_for_status keeps the 404 handling below
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+    session = Session()
+    session.headers.update(HEADERS)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+# One keep-alive connection pool shared by get_jobs and get_job_details (and their worker threads)
+SESSION = create_session()
+
+def get_request(url, delay=1, decode=True):
+    endpoint = "detail" if "/jobPostings/" in url else "search"
+    rate_limiter = RATE_LIMITERS[endpoint]
     if delay:
-        time.sleep(1)
-    response = get(url, headers=HEADERS)
+        # Shared across worker threads, so concurrent fetches still respect
+        # the endpoint's request budget instead of each sleeping independently
+        rate_limiter.acquire()
+    started = time.perf_counter()
+    response = SESSION.get(url, timeout=HTTP_TIMEOUT)
+    elapsed = time.perf_counter() - started
+    METRICS.observe("http_request_seconds", elapsed, endpoint=endpoint)
+    # Attempts urllib3 retried on its own are throttling signals too; their backoff sleeps make
+    # the elapsed time meaningless as a latency sample
+    retries = getattr(response.raw, "retries", None)
+    history = retries.history if retries is not None else ()
+    for attempt in history:
+        if attempt.status is not None:
+            rate_limiter.record(attempt.status)
+    rate_limiter.record(response.status_code, None if history else elapsed)
+    METRICS.inc("http_responses_total", endpoint=endpoint, status=response.status_code)
+    METRICS.inc("http_response_bytes_total", len(response.content), endpoint=endpoint)
+    if response.status_code == 999:
+        # Not an HTTP error class, raise_for_status would let it through
+        raise HTTPError(f"999 Request denied for url: {url}", response=response)
     response.raise_for_status()
-    return response.json()
+    return response.json() if decode else response.content
 
 def add_parameters(url: str, count: int = 50, start: int = 0):
     parsed = urlparse(url)
@@ -28,8 +93,61 @@ def add_parameters(url: str, count: int = 50, start: int = 0):
 
     return urlunparse(parsed._replace(query=new_query))
 
-def get_jobs(url: str):   
+RECENCY_SORT = "sortBy:List(DD)"
+SELECTED_FILTERS = "selectedFilters:("
+
+def _merge_recency_sort(search_query: str):
+    # Insert sortBy into the top-level selectedFilters tuple, or add one; a second
+    # selectedFilters key would be ignored by the server
+    depth = 0
+    for position, char in enumerate(search_query):
+        if depth == 1 and search_query[position - 1] in "(," and search_query.startswith(SELECTED_FILTERS, position):
+            insert_at = position + len(SELECTED_FILTERS)
+            separator = "" if search_query[insert_at] == ")" else ","
+            return search_query[:insert_at] + RECENCY_SORT + separator + search_query[insert_at:]
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+    return search_query[:-1] + f",{SELECTED_FILTERS}{RECENCY_SORT}))"
+
+def add_recency_sort(url: str):
+    """Return (url, sorted_by_date).
+
+    Voyager search options live inside the "query" tuple, e.g. query=(keywords:...,selectedFilters:(...)).
+    An explicit sort other than by date is left alone and reported as not sorted.
+    """
+    parsed = urlparse(url)
+    query = parse_qs(parsed.query)
+    search_query = query.get("query", [""])[0]
+
+    if not search_query.startswith("("):
+        return url, False
+    if RECENCY_SORT in search_query:
+        return url, True
+    if "sortBy:" in search_query:
+        return url, False
+
+    query["query"] = [_merge_recency_sort(search_query)]
+    new_query = urlencode(query, doseq=True, safe=":,()")
+
+    return urlunparse(parsed._replace(query=new_query)), True
+
+def get_jobs(url: str, known_ids=None, stop_after_known_pages: int = 2):
+        """Yield search result pages.
+
+        When known_ids is given the search is sorted by date and paging stops after
+        stop_after_known_pages consecutive pages holding only already loaded ids.
+        A search with an explicit non-date sort is always paged through completely.
+        """
         url = add_parameters(url)
+        if known_ids is not None:
+            url, sorted_by_date = add_recency_sort(url)
+            if not sorted_by_date:
+                # Known pages only say nothing new follows when results are newest first
+                print("Search is not sorted by date, paging through every result")
+                known_ids = None
+        known_pages = 0
 
         get_job_id = lambda job:   job.get("jobCardUnion",{}).\
                                     get("jobPostingCard",{}).\
@@ -49,8 +167,17 @@ def get_jobs(url: str):
                                         get("total",0)
 
             elements = job_response["elements"]
+            job_ids = [int(get_job_id(element)) for element in elements if get_job_id(element)]
+            METRICS.inc("search_pages_total")
+            METRICS.inc("search_ids_seen_total", len(job_ids))
             
-            yield {"total_jobs": int(total_jobs), "jobs": [int(get_job_id(element)) for element in elements if get_job_id(element)]}
+            yield {"total_jobs": int(total_jobs), "jobs": job_ids}
+
+            if known_ids is not None:
+                known_pages = known_pages + 1 if all(job_id in known_ids for job_id in job_ids) else 0
+                if known_pages >= stop_after_known_pages:
+                    print(f"Stopping pagination, last {known_pages} pages only had known jobs")
+                    break
             
             start += step
             url = add_parameters(url=url, start=start)
@@ -58,14 +185,22 @@ def get_jobs(url: str):
 def get_job_details(job_id: str): 
     try:
         url = DETAIL_URL.replace('job_id',job_id)
-        job_detail_response = get_request(url)
+        content = get_request(url, decode=False)
     except HTTPError as e:
         if e.response is not None and e.response.status_code == 404:
             # It's possible (for whatever reason) that a job detail is not available
             # in this case we ignore it and continue the rest of the ETL pipeline
+            METRICS.inc("job_details_not_found_total")
             return ({}, {})
         raise
 
+    if FAST_JSON:
+        records = decode_job_posting(content)
+        if records is not None:
+            return records
+    return parse_job_details(json.loads(content))
+
+def parse_job_details(job_detail_response):
     job_information = {}
     company_information = {}
     
@@ -0,0 +1,142 @@
+import os
+import threading
+import time
+
+from utils.metrics import METRICS
+
+# "adaptive" tunes each endpoint's rate from its responses, "fixed" keeps the configured rate
+RATE_CONTROL = os.environ.get("RATE_CONTROL", "adaptive")
+# Smoothed latency above this multiple of the best smoothed latency counts as congestion
+RATE_LATENCY_FACTOR = float(os.environ.get("RATE_LATENCY_FACTOR", 2))
+# 999 is LinkedIn's "request denied" answer to clients it considers too aggressive
+THROTTLE_STATUSES = frozenset({429, 999})
+ENDPOINTS = ("search", "detail")
+
+class TokenBucket:
+    """Thread-safe token bucket shared by every caller of a LinkedIn endpoint.
+
+    `rate` tokens are added per second up to `capacity`; `acquire` blocks
+    until a token is available, so N workers together never exceed `rate`.
+    """
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self, tokens: float = 1):
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def set_rate(self, rate: float):
+        with self._lock:
+            # Tokens earned so far count at the old rate
+            self._refill()
+            self.rate = rate
+
+class AdaptiveRate:
+    """AIMD pacing for one endpoint on top of a TokenBucket.
+
+    Every `rate` healthy responses (about one second of traffic) the rate grows by
+    `increase`; a 429/999 halves it, a 5xx or a latency spike cuts it by
+    `latency_decrease`. Decreases are applied at most once per `cooldown` seconds,
+    so a burst of in-flight requests failing together counts as one signal.
+    """
+    def __init__(self, endpoint, rate, min_rate, max_rate, capacity=1, increase=None,
+                 decrease=0.5, latency_decrease=0.8, latency_factor=RATE_LATENCY_FACTOR, cooldown=2.0):
+        self.endpoint = endpoint
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.bucket = TokenBucket(min(max_rate, max(min_rate, rate)), capacity)
+        self.increase = increase if increase is not None else max(0.05, rate * 0.1)
+        self.decrease = decrease
+        self.latency_decrease = latency_decrease
+        self.latency_factor = latency_factor
+        self.cooldown = cooldown
+        self._healthy = 0
+        self._latency = None
+        self._baseline = None
+        self._last_decrease = float("-inf")
+        self._lock = threading.Lock()
+        METRICS.set_gauge("request_rate_limit", self.bucket.rate, endpoint=endpoint)
+
+    @property
+    def rate(self):
+        return self.bucket.rate
+
+    def acquire(self):
+        self.bucket.acquire()
+
+    def record(self, status, latency=None):
+        """Feed back one response; latency only for responses urllib3 did not retry."""
+        with self._lock:
+            if status in THROTTLE_STATUSES:
+                METRICS.inc("throttled_responses_total", endpoint=self.endpoint, status=status)
+                return self._decrease(self.decrease, "throttled")
+            if status >= 500:
+                return self._decrease(self.latency_decrease, "server_error")
+            if latency is not None:
+                self._latency = latency if self._latency is None else 0.8 * self._latency + 0.2 * latency
+                # Drifts up slowly, one unusually fast spell must not hold the rate down for the whole run
+                self._baseline = self._latency if self._baseline is None else min(self._latency, self._baseline * 1.001)
+                if self._latency > self.latency_factor * self._baseline:
+                    return self._decrease(self.latency_decrease, "latency")
+            # 404s and other client errors say nothing about upstream load and count as healthy
+            self._healthy += 1
+            if self._healthy >= max(1, self.bucket.rate):
+                self._set_rate(self.bucket.rate + self.increase, "increase")
+
+    def _decrease(self, factor, reason):
+        self._healthy = 0
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self._set_rate(self.bucket.rate * factor, reason)
+
+    def _set_rate(self, rate, reason):
+        self._healthy = 0
+        rate = min(self.max_rate, max(self.min_rate, rate))
+        if rate == self.bucket.rate:
+            return
+        self.bucket.set_rate(rate)
+        METRICS.set_gauge("request_rate_limit", rate, endpoint=self.endpoint)
+        METRICS.inc("rate_limit_changes_total", endpoint=self.endpoint, reason=reason)
+        if reason != "increase":
+            print(f"Slowing {self.endpoint} requests to {rate:.2f}/s ({reason})")
+            METRICS.emit("rate_change", endpoint=self.endpoint, rate=round(rate, 3), reason=reason)
+
+def _endpoint_setting(endpoint, name, default):
+    # LINKEDIN_DETAIL_REQUESTS_PER_SECOND overrides LINKEDIN_REQUESTS_PER_SECOND for the detail endpoint
+    value = os.environ.get(f"LINKEDIN_{endpoint.upper()}_{name}", os.environ.get(f"LINKEDIN_{name}"))
+    return float(value) if value is not None else default
+
+def create_rate_limiters(rate_control=RATE_CONTROL):
+    """One budget per endpoint, shared by every worker thread and config."""
+    limiters = {}
+    for endpoint in ENDPOINTS:
+        rate = _endpoint_setting(endpoint, "REQUESTS_PER_SECOND", 1.0)
+        if rate_control == "adaptive":
+            min_rate = _endpoint_setting(endpoint, "MIN_REQUESTS_PER_SECOND", min(rate, 0.2))
+            max_rate = _endpoint_setting(endpoint, "MAX_REQUESTS_PER_SECOND", rate * 4)
+        else:
+            min_rate = max_rate = rate
+        limiters[endpoint] = AdaptiveRate(
+            endpoint, rate, min_rate, max_rate,
+            capacity=_endpoint_setting(endpoint, "REQUESTS_BURST", 1.0),
+        )
+    return limiters
+
+RATE_LIMITERS = create_rate_limiters()
@@ -0,0 +1,209 @@
+from typing import Any, Optional
+
+from utils.metrics import METRICS
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# msgspec decodes straight into the structs below and skips every other field of the
+# WebFullJobPosting decoration; orjson still builds the whole dict, just faster than json
+FAST_JSON_DECODER = "msgspec" if msgspec is not None else "orjson" if orjson is not None else None
+
+NO_DATA = "No Data Available"
+COMPANY_DECORATION = "com.linkedin.voyager.deco.jobs.web.shared.WebJobPostingCompany"
+VECTOR_IMAGE = "com.linkedin.common.VectorImage"
+
+# Unexpected shapes or types in a response; the caller then retries it with json
+DECODE_ERRORS = (ValueError, TypeError, AttributeError) + ((msgspec.DecodeError,) if msgspec is not None else ())
+
+class JobRecord:
+    """The lk_jobs fields of one detail response (JOB_COLS).
+
+    get() mirrors dict.get, so prep_row handles records and the dicts of the plain path alike.
+    """
+    __slots__ = (
+        "job_id", "job_name", "standardized_name", "job_url", "job_description", "job_type",
+        "job_functions", "job_experience_level", "job_views", "company_id",
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+class CompanyRecord:
+    """The lk_companies fields of one detail response (COMPANY_COLS without content_hash)."""
+    __slots__ = (
+        "company_id", "company_name", "company_image_url", "company_description",
+        "company_staff_count", "company_url", "company_follower_count", "company_industries",
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+if msgspec is not None:
+    # Only the fields read by records_from_struct; defaults match the .get() defaults of api.parse_job_details
+    class _VectorImageArtifact(msgspec.Struct):
+        fileIdentifyingUrlPathSegment: Optional[str] = ""
+
+    class _VectorImage(msgspec.Struct):
+        rootUrl: Optional[str] = ""
+        artifacts: list[_VectorImageArtifact] = []
+
+    class _LogoImage(msgspec.Struct):
+        vector_image: Optional[_VectorImage] = msgspec.field(default=None, name=VECTOR_IMAGE)
+
+    class _Logo(msgspec.Struct):
+        image: Optional[_LogoImage] = None
+
+    class _FollowingInfo(msgspec.Struct):
+        followerCount: Any = 0
+
+    class _Company(msgspec.Struct):
+        entityUrn: str = ""
+        universalName: Optional[str] = NO_DATA
+        description: Optional[str] = NO_DATA
+        staffCount: Any = 0
+        url: Any = 0
+        followingInfo: Optional[_FollowingInfo] = None
+        industries: list[str] = []
+        logo: Optional[_Logo] = None
+
+    class _CompanyDecoration(msgspec.Struct):
+        companyResolutionResult: Optional[_Company] = None
+
+    class _CompanyDetails(msgspec.Struct):
+        company: Optional[_CompanyDecoration] = msgspec.field(default=None, name=COMPANY_DECORATION)
+
+    class _StandardizedTitle(msgspec.Struct):
+        localizedName: Optional[str] = NO_DATA
+
+    class _Description(msgspec.Struct):
+        text: Optional[str] = NO_DATA
+
+    class _JobPosting(msgspec.Struct):
+        jobPostingId: Optional[int] = None
+        title: Optional[str] = NO_DATA
+        standardizedTitleResolutionResult: Optional[_StandardizedTitle] = None
+        jobPostingUrl: Optional[str] = NO_DATA
+        description: Optional[_Description] = None
+        formattedEmploymentStatus: Optional[str] = NO_DATA
+        formattedJobFunctions: list[str] = []
+        formattedExperienceLevel: Optional[str] = NO_DATA
+        views: Any = -1
+        companyDetails: Optional[_CompanyDetails] = None
+
+    _JOB_POSTING_DECODER = msgspec.json.Decoder(_JobPosting)
+
+def _company_id(entity_urn):
+    return int(entity_urn.split(":")[-1])
+
+def records_from_struct(posting):
+    company = None
+    if posting.companyDetails and posting.companyDetails.company:
+        company_data = posting.companyDetails.company.companyResolutionResult
+        if company_data is not None:
+            image_url = NO_DATA
+            vector_image = company_data.logo.image.vector_image if company_data.logo and company_data.logo.image else None
+            if vector_image and vector_image.artifacts:
+                image_data = vector_image.artifacts[0].fileIdentifyingUrlPathSegment
+                if image_data and vector_image.rootUrl:
+                    image_url = vector_image.rootUrl + image_data
+            company = CompanyRecord(
+                company_id=_company_id(company_data.entityUrn),
+                company_name=company_data.universalName,
+                company_image_url=image_url,
+                company_description=company_data.description,
+                company_staff_count=company_data.staffCount,
+                company_url=company_data.url,
+                company_follower_count=company_data.followingInfo.followerCount if company_data.followingInfo else 0,
+                company_industries="|".join(company_data.industries),
+            )
+
+    job = JobRecord(
+        job_id=posting.jobPostingId,
+        job_name=posting.title,
+        standardized_name=posting.standardizedTitleResolutionResult.localizedName if posting.standardizedTitleResolutionResult else NO_DATA,
+        job_url=posting.jobPostingUrl,
+        job_description=posting.description.text if posting.description else NO_DATA,
+        job_type=posting.formattedEmploymentStatus,
+        job_functions="|".join(posting.formattedJobFunctions),
+        job_experience_level=posting.formattedExperienceLevel,
+        job_views=posting.views,
+        company_id=company.company_id if company else None,
+    )
+    return job, company
+
+def records_from_dict(response):
+    # orjson rejects lone surrogates, so unlike api.parse_job_details no utf-8 round-trip is needed
+    company = None
+    company_data = response.get("companyDetails", {}).get(COMPANY_DECORATION, {}).get("companyResolutionResult", {})
+    if company_data:
+        image_url = NO_DATA
+        vector_image = company_data.get("logo", {}).get("image", {}).get(VECTOR_IMAGE, {})
+        if vector_image and vector_image.get("artifacts"):
+            image_data = vector_image["artifacts"][0].get("fileIdentifyingUrlPathSegment", "")
+            root_url = vector_image.get("rootUrl", "")
+            if image_data and root_url:
+                image_url = root_url + image_data
+        company = CompanyRecord(
+            company_id=_company_id(company_data.get("entityUrn", "")),
+            company_name=company_data.get("universalName", NO_DATA),
+            company_image_url=image_url,
+            company_description=company_data.get("description", NO_DATA),
+            company_staff_count=company_data.get("staffCount", 0),
+            company_url=company_data.get("url", 0),
+            company_follower_count=company_data.get("followingInfo", {}).get("followerCount", 0),
+            company_industries="|".join(company_data.get("industries", [])),
+        )
+
+    job = JobRecord(
+        job_id=response.get("jobPostingId", -1),
+        job_name=response.get("title", NO_DATA),
+        standardized_name=response.get("standardizedTitleResolutionResult", {}).get("localizedName", NO_DATA),
+        job_url=response.get("jobPostingUrl", NO_DATA),
+        job_description=response.get("description", {}).get("text", NO_DATA),
+        job_type=response.get("formattedEmploymentStatus", NO_DATA),
+        job_functions="|".join(response.get("formattedJobFunctions", [])),
+        job_experience_level=response.get("formattedExperienceLevel", NO_DATA),
+        job_views=response.get("views", -1),
+        company_id=company.company_id if company else None,
+    )
+    return job, company
+
+def decode_job_posting(content, decoder=FAST_JSON_DECODER):
+    """Decode a detail response body into (JobRecord, CompanyRecord or {}).
+
+    Returns ({}, {}) for an empty posting, like the plain path, and None when the fast
+    decoder rejects the body (bad types, invalid surrogates), in which case the caller
+    falls back to json.
+    """
+    try:
+        if decoder == "msgspec":
+            posting = _JOB_POSTING_DECODER.decode(content)
+            # A posting without id cannot be loaded, the plain path treats only {} as empty
+            if posting.jobPostingId is None:
+                return ({}, {})
+            job, company = records_from_struct(posting)
+        else:
+            response = orjson.loads(content)
+            if not response:
+                return ({}, {})
+            job, company = records_from_dict(response)
+    except DECODE_ERRORS:
+        METRICS.inc("json_fast_path_fallbacks_total", decoder=decoder)
+        return None
+    return (job, company or {})
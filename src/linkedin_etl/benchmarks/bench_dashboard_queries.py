@@ -0,0 +1,286 @@
+"""Capture EXPLAIN ANALYZE plans and timings for the dashboard queries.
+
+Run from src/linkedin_etl against a throwaway database (MySQL 8.0.18+ for EXPLAIN ANALYZE),
+once without and once with the lk_jobs indexes (revision 2c7f5b8e1a94), then compare the two reports.
+The downgrade also drops the later revisions, queries needing them (FULLTEXT search, KPI summary)
+are reported as skipped in the "before" run:
+
+    alembic downgrade d41b7e9a2f60
+    DATABASE_URL=mysql+pymysql://... python -m benchmarks.bench_dashboard_queries --seed-rows 1000000 --label before
+    alembic upgrade head
+    DATABASE_URL=mysql+pymysql://... python -m benchmarks.bench_dashboard_queries --label after
+    python -m benchmarks.bench_dashboard_queries --compare tmp_data/bench/dashboard_before.json tmp_data/bench/dashboard_after.json
+
+--seed-rows inserts synthetic jobs/companies spread over --days of history under etl_id -1,
+--cleanup removes them again.
+
+--check-search compares the FULLTEXT search with the LIKE search it replaced on the loaded jobs
+and lists the jobs only LIKE finds, e.g. words the index does not tokenize:
+
+    DATABASE_URL=mysql+pymysql://... python -m benchmarks.bench_dashboard_queries --check-search "data engineer" analyst bi
+"""
+import argparse
+import datetime as dt
+import json
+import random
+import string
+import time
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from database.rollups import refresh_daily_rollup
+from models.session import engine
+
+BENCH_ETL_ID = -1
+# Far above real LinkedIn job ids so synthetic rows never collide with loaded ones
+BENCH_ID_OFFSET = 9_000_000_000_000
+# lk_jobs.company_id is an INT, company ids have to stay below 2**31 (real ones are far below this)
+BENCH_COMPANY_ID_OFFSET = 2_000_000_000
+SEED_BATCH_SIZE = 5000
+EXPERIENCE_LEVELS = ["Entry level", "Associate", "Mid-Senior level", "Director", "Internship"]
+STANDARDIZED_NAMES = ["Data Engineer", "Data Analyst", "Software Engineer", "Data Scientist", "Analytics Engineer"]
+# What utils.query_builder.fulltext_query("data engineer") produces
+SEARCH_QUERY = '+"data" +"engineer"'
+FULLTEXT_MATCH = "MATCH(j.standardized_name, j.job_name, j.job_description)"
+
+# Same SQL as the pages in src/streamlit (keep in sync), with a typical 30 day window
+QUERIES = {
+    "jobs_explorer_approx_count": """
+        SELECT COALESCE(SUM(r.job_count), 0) AS cnt
+        FROM lk_job_daily_rollup r
+        WHERE r.rollup_date BETWEEN :start_d AND :end_d
+          AND r.job_experience_level IN ('Associate', 'Mid-Senior level')
+    """,
+    "jobs_explorer_exact_count_search": f"""
+        SELECT COUNT(*) AS cnt
+        FROM lk_jobs j
+        WHERE j.last_updated BETWEEN :start_ts AND :end_ts
+          AND {FULLTEXT_MATCH} AGAINST (:q IN BOOLEAN MODE)
+    """,
+    "jobs_explorer_page": """
+        SELECT j.job_id, j.job_name, j.standardized_name, j.job_url, c.company_name, j.job_type,
+               j.job_views, j.job_experience_level, j.created_at, s.city, j.last_updated,
+               j.last_updated AS sort_key
+        FROM lk_jobs j
+        LEFT JOIN lk_companies c ON c.company_id = j.company_id
+        LEFT JOIN lk_etl_status s ON s.etl_id = j.etl_id
+        WHERE j.last_updated BETWEEN :start_ts AND :end_ts
+          AND j.job_experience_level IN ('Associate', 'Mid-Senior level')
+        ORDER BY sort_key DESC, j.job_id DESC
+        LIMIT 26
+    """,
+    "jobs_explorer_page_search": f"""
+        SELECT j.job_id, j.job_name, j.standardized_name, j.job_url, c.company_name, j.job_type,
+               j.job_views, j.job_experience_level, j.created_at, s.city, j.last_updated,
+               ROUND({FULLTEXT_MATCH} AGAINST (:q IN BOOLEAN MODE), 6) AS sort_key
+        FROM lk_jobs j
+        LEFT JOIN lk_companies c ON c.company_id = j.company_id
+        LEFT JOIN lk_etl_status s ON s.etl_id = j.etl_id
+        WHERE j.last_updated BETWEEN :start_ts AND :end_ts
+          AND {FULLTEXT_MATCH} AGAINST (:q IN BOOLEAN MODE)
+        ORDER BY sort_key DESC, j.job_id DESC
+        LIMIT 26
+    """,
+    "companies_top": """
+        SELECT c.company_id, c.company_name, c.company_url, c.company_image_url,
+               c.company_follower_count, c.company_industries, COUNT(*) AS vacancies
+        FROM lk_jobs j
+        JOIN lk_companies c ON c.company_id = j.company_id
+        LEFT JOIN lk_etl_status s ON s.etl_id = j.etl_id
+        WHERE j.last_updated BETWEEN :start_ts AND :end_ts
+        GROUP BY c.company_id, c.company_name, c.company_url, c.company_image_url,
+                 c.company_follower_count, c.company_industries
+        ORDER BY vacancies DESC, c.company_name ASC
+        LIMIT 20
+    """,
+    "companies_top_search": f"""
+        SELECT c.company_id, c.company_name, c.company_url, c.company_image_url,
+               c.company_follower_count, c.company_industries, COUNT(*) AS vacancies
+        FROM lk_jobs j
+        JOIN lk_companies c ON c.company_id = j.company_id
+        LEFT JOIN lk_etl_status s ON s.etl_id = j.etl_id
+        WHERE j.last_updated BETWEEN :start_ts AND :end_ts
+          AND {FULLTEXT_MATCH} AGAINST (:q IN BOOLEAN MODE)
+        GROUP BY c.company_id, c.company_name, c.company_url, c.company_image_url,
+                 c.company_follower_count, c.company_industries
+        ORDER BY vacancies DESC, c.company_name ASC
+        LIMIT 20
+    """,
+    "companies_jobs": """
+        SELECT j.job_name, j.standardized_name, c.company_name, j.job_type, j.job_views,
+               j.job_experience_level, j.created_at, s.city, j.last_updated, j.job_url
+        FROM lk_jobs j
+        JOIN lk_companies c ON c.company_id = j.company_id
+        LEFT JOIN lk_etl_status s ON s.etl_id = j.etl_id
+        WHERE j.last_updated BETWEEN :start_ts AND :end_ts
+          AND j.company_id = :company_id
+        ORDER BY j.last_updated DESC, j.job_id DESC
+        LIMIT 2000
+    """,
+    "trends_daily": """
+        SELECT r.rollup_date AS d, NULLIF(r.city, '') AS city, SUM(r.job_count) AS total_jobs
+        FROM lk_job_daily_rollup r
+        WHERE r.rollup_date BETWEEN :start_d AND :end_d
+        GROUP BY r.rollup_date, r.city
+    """,
+    "home_kpis": "SELECT * FROM lk_kpi_summary WHERE summary_id = 1",
+}
+
+def random_text(length):
+    return "".join(random.choices(string.ascii_letters + "  ", k=length))
+
+def seed(rows, days, companies):
+    today = dt.date.today()
+    with engine.begin() as conn:
+        # Only gives the synthetic jobs a city; marked as loaded today and without a URL,
+        # so fetch_etl_configs never picks it up as a search to run
+        conn.execute(text(
+            "INSERT INTO lk_etl_status (etl_id, etl_search, etl_url, is_running, last_updated, country, city) "
+            "VALUES (:etl_id, 'benchmark', '', 0, CURDATE(), 'Switzerland', 'Benchmark') "
+            "ON DUPLICATE KEY UPDATE etl_url = '', is_running = 0, last_updated = CURDATE()"
+        ), {"etl_id": BENCH_ETL_ID})
+        conn.execute(text(
+            "INSERT IGNORE INTO lk_companies (company_id, company_name) VALUES (:company_id, :company_name)"
+        ), [{"company_id": BENCH_COMPANY_ID_OFFSET + i, "company_name": random_text(20)} for i in range(companies)])
+
+    insert_sql = text("""
+        INSERT IGNORE INTO lk_jobs (job_id, job_name, standardized_name, job_url, job_description,
+                                    job_experience_level, job_views, etl_id, company_id, created_at, last_updated)
+        VALUES (:job_id, :job_name, :standardized_name, :job_url, :job_description,
+                :job_experience_level, :job_views, :etl_id, :company_id, :last_updated, :last_updated)
+    """)
+    started = time.perf_counter()
+    for batch_start in range(0, rows, SEED_BATCH_SIZE):
+        batch = []
+        for i in range(batch_start, min(rows, batch_start + SEED_BATCH_SIZE)):
+            job_id = BENCH_ID_OFFSET + i
+            batch.append({
+                "job_id": job_id,
+                "job_name": f"{random.choice(STANDARDIZED_NAMES)} {random_text(20)}",
+                "standardized_name": random.choice(STANDARDIZED_NAMES),
+                "job_url": f"https://www.linkedin.com/jobs/view/{job_id}",
+                "job_description": random_text(500),
+                "job_experience_level": random.choice(EXPERIENCE_LEVELS),
+                "job_views": random.randint(0, 5000),
+                "etl_id": BENCH_ETL_ID,
+                "company_id": BENCH_COMPANY_ID_OFFSET + random.randrange(companies),
+                "last_updated": today - dt.timedelta(days=random.randrange(days)),
+            })
+        with engine.begin() as conn:
+            conn.execute(insert_sql, batch)
+    # The trends and approximate count queries read the rollup, not lk_jobs
+    refresh_daily_rollup([(today - dt.timedelta(days=day), BENCH_ETL_ID) for day in range(days)])
+    print(f"Seeded {rows} jobs over {days} days in {time.perf_counter() - started:.1f}s")
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE TABLE lk_jobs, lk_companies"))
+
+def fulltext_query(text):
+    # Same as utils.query_builder.fulltext_query in src/streamlit (keep in sync)
+    words = [w for w in "".join(ch if ch.isalnum() else " " for ch in text).split() if w]
+    return " ".join(f'+"{w}"' for w in words)
+
+def check_search(terms, samples=5):
+    # The explorers used LOWER(standardized_name) LIKE '%term%' before the FULLTEXT index
+    print(f"{'term':<24}{'like':>10}{'fulltext':>10}{'like only':>11}")
+    with engine.connect() as conn:
+        for term in terms:
+            params = {"like_q": f"%{term.lower()}%", "q": fulltext_query(term)}
+            like_count, match_count, like_only = conn.execute(text(f"""
+                SELECT SUM(LOWER(j.standardized_name) LIKE :like_q),
+                       SUM({FULLTEXT_MATCH} AGAINST (:q IN BOOLEAN MODE) > 0),
+                       SUM(LOWER(j.standardized_name) LIKE :like_q AND NOT {FULLTEXT_MATCH} AGAINST (:q IN BOOLEAN MODE))
+                FROM lk_jobs j
+            """), params).one()
+            print(f"{term:<24}{like_count or 0:>10}{match_count or 0:>10}{like_only or 0:>11}")
+            if like_only:
+                for job_id, name in conn.execute(text(f"""
+                    SELECT j.job_id, j.standardized_name FROM lk_jobs j
+                    WHERE LOWER(j.standardized_name) LIKE :like_q AND NOT {FULLTEXT_MATCH} AGAINST (:q IN BOOLEAN MODE)
+                    LIMIT {samples}
+                """), params):
+                    print(f"    {job_id}  {name}")
+
+def cleanup():
+    with engine.begin() as conn:
+        conn.execute(text(f"DELETE FROM lk_jobs WHERE etl_id = {BENCH_ETL_ID}"))
+        conn.execute(text(f"DELETE FROM lk_job_daily_rollup WHERE etl_id = {BENCH_ETL_ID}"))
+        conn.execute(text(
+            f"DELETE FROM lk_companies WHERE company_id BETWEEN {BENCH_COMPANY_ID_OFFSET} AND {BENCH_COMPANY_ID_OFFSET + 99_999_999}"
+        ))
+        conn.execute(text(f"DELETE FROM lk_etl_status WHERE etl_id = {BENCH_ETL_ID}"))
+    print("Removed synthetic benchmark rows")
+
+def run(label, repeat, window_days, output_dir):
+    end_d = dt.date.today()
+    start_d = end_d - dt.timedelta(days=window_days)
+    params = {
+        "start_ts": dt.datetime.combine(start_d, dt.time.min),
+        "end_ts": dt.datetime.combine(end_d, dt.time.max),
+        "start_d": start_d,
+        "end_d": end_d,
+        "company_id": BENCH_COMPANY_ID_OFFSET,
+        "q": SEARCH_QUERY,
+    }
+
+    results = {}
+    print(f"{'query':<34}{'median ms':>12}{'min ms':>10}")
+    with engine.connect() as conn:
+        for name, sql in QUERIES.items():
+            timings = []
+            try:
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    conn.execute(text(sql), params).fetchall()
+                    timings.append((time.perf_counter() - started) * 1000)
+                plan = "\n".join(row[0] for row in conn.execute(text(f"EXPLAIN ANALYZE {sql}"), params))
+            except DBAPIError as error:
+                # e.g. MATCH without the FULLTEXT index, or lk_kpi_summary on a downgraded schema
+                conn.rollback()
+                print(f"{name:<34}{'skipped':>12}  {error.orig}")
+                continue
+            timings.sort()
+            results[name] = {"median_ms": timings[len(timings) // 2], "min_ms": timings[0], "plan": plan}
+            print(f"{name:<34}{results[name]['median_ms']:>12.1f}{results[name]['min_ms']:>10.1f}")
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_path = output_dir / f"dashboard_{label}.json"
+    output_path.write_text(json.dumps({"label": label, "window_days": window_days, "queries": results}, indent=2))
+    print(f"Plans written to {output_path}")
+
+def compare(before_path, after_path):
+    before = json.loads(Path(before_path).read_text())
+    after = json.loads(Path(after_path).read_text())
+    print(f"{'query':<34}{before['label'] + ' ms':>14}{after['label'] + ' ms':>14}{'speedup':>10}")
+    for name, result in after["queries"].items():
+        if name not in before["queries"]:
+            continue
+        before_ms = before["queries"][name]["median_ms"]
+        after_ms = result["median_ms"]
+        print(f"{name:<34}{before_ms:>14.1f}{after_ms:>14.1f}{before_ms / max(after_ms, 0.001):>9.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--label", default="run", help="name of this report, e.g. before/after")
+    parser.add_argument("--seed-rows", type=int, default=0, help="insert this many synthetic jobs first")
+    parser.add_argument("--days", type=int, default=730, help="history spanned by the synthetic jobs")
+    parser.add_argument("--companies", type=int, default=5000)
+    parser.add_argument("--window-days", type=int, default=30, help="date range used by the queries")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output-dir", type=Path, default=Path("tmp_data") / "bench")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="print the speedup between two reports")
+    parser.add_argument("--cleanup", action="store_true", help="delete the synthetic rows and exit")
+    parser.add_argument("--check-search", nargs="+", metavar="TERM", help="compare FULLTEXT and LIKE results for these searches")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+    elif args.cleanup:
+        cleanup()
+    elif args.check_search:
+        check_search(args.check_search)
+    else:
+        if args.seed_rows:
+            seed(args.seed_rows, args.days, args.companies)
+        run(args.label, args.repeat, args.window_days, args.output_dir)
@@ -0,0 +1,82 @@
+"""Compare decoding job detail responses with json (api.parse_job_details) and the fast decoders.
+
+Run from src/linkedin_etl, no database or network needed:
+
+    python -m benchmarks.bench_json_decoding --responses 2000 --padding-kb 40 --threads 1 8
+
+Responses are the synthetic postings of benchmarks/fake_linkedin_api.py padded with
+--padding-kb of fields the ETL never reads, which is what most of a real
+WebFullJobPosting decoration is. Decoders that are not installed are skipped.
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from api.api import parse_job_details
+from api.voyager_records import decode_job_posting, msgspec, orjson
+from benchmarks.fake_linkedin_api import FAKE_ID_OFFSET, FakeApiConfig, job_detail
+from data_processing.pipeline import JOB_COLS, COMPANY_COLS
+from utils.data_cleaner import prep_row
+
+def padded_response(config, job_id, padding_kb):
+    payload = job_detail(config, job_id)
+    # Nested noise shaped like the insights/apply/recruiter blocks of the real decoration
+    payload["applyMethod"] = {"companyApplyUrl": f"https://example.com/apply/{job_id}", "easyApplyUrl": None}
+    payload["jobPostingInsights"] = [
+        {"type": f"INSIGHT_{i}", "text": {"text": "x" * 200, "attributes": [{"start": 0, "length": 10}] * 5}}
+        for i in range(max(1, padding_kb * 1024 // 400))
+    ]
+    return json.dumps(payload).encode("utf-8")
+
+def decode_json(content):
+    return parse_job_details(json.loads(content))
+
+def decoders():
+    available = {"json": decode_json}
+    if orjson is not None:
+        available["orjson"] = lambda content: decode_job_posting(content, decoder="orjson")
+    if msgspec is not None:
+        available["msgspec"] = lambda content: decode_job_posting(content, decoder="msgspec")
+    return available
+
+def check_same_rows(responses, available):
+    # Every decoder must produce the rows the json path writes to jobs.csv/companies.csv
+    expected = [(prep_row(job, JOB_COLS), prep_row(company, COMPANY_COLS)) for job, company in map(decode_json, responses)]
+    for name, decode in available.items():
+        rows = [(prep_row(job, JOB_COLS), prep_row(company, COMPANY_COLS)) for job, company in map(decode, responses)]
+        if rows != expected:
+            raise SystemExit(f"{name} rows differ from the json path")
+
+def run(responses, threads, repeat):
+    available = decoders()
+    check_same_rows(responses[:50], available)
+    total_mb = sum(len(content) for content in responses) / 1024 / 1024
+    print(f"{len(responses)} responses, {total_mb / len(responses) * 1024:.1f} KB each")
+    print(f"{'decoder':<10}{'threads':>8}{'us/response':>14}{'MB/s':>10}{'speedup':>10}")
+    for workers in threads:
+        baseline = None
+        for name, decode in available.items():
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    for _ in executor.map(decode, responses, chunksize=max(1, len(responses) // workers // 4)):
+                        pass
+                timings.append(time.perf_counter() - started)
+            elapsed = min(timings)
+            baseline = baseline or elapsed
+            print(f"{name:<10}{workers:>8}{elapsed / len(responses) * 1e6:>14.1f}{total_mb / elapsed:>10.1f}{baseline / elapsed:>9.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--responses", type=int, default=2000)
+    parser.add_argument("--description-chars", type=int, default=5000)
+    parser.add_argument("--padding-kb", type=int, default=40, help="unused fields added to every response")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    config = FakeApiConfig(description_chars=args.description_chars)
+    responses = [padded_response(config, FAKE_ID_OFFSET + i, args.padding_kb) for i in range(args.responses)]
+    run(responses, args.threads, args.repeat)
@@ -0,0 +1,90 @@
+"""Compare the staging bulk loaders on synthetic jobs/companies files.
+
+Run from src/linkedin_etl against a throwaway database:
+
+    DATABASE_URL=mysql+pymysql://... python -m benchmarks.bench_loaders --rows 10000 100000 1000000
+
+The "server" loader needs --server-dir, the directory where the MySQL server sees
+--data-dir, and "local" needs BULK_LOADER=local so the client enables local_infile.
+"""
+import argparse
+import random
+import string
+import time
+from pathlib import Path
+
+from data_processing.pipeline import JOB_COLS, COMPANY_COLS
+from database.load_tables import execute_sql
+from database.loaders import LOADERS
+from filesystem.file_manager import get_file_handle, delete_file
+from utils.data_cleaner import prep_row
+
+BENCH_ETL_ID = -1
+
+def random_text(length):
+    return "".join(random.choices(string.ascii_letters + "  ", k=length))
+
+def synthetic_job(job_id):
+    return {
+        "job_id": job_id,
+        "job_name": random_text(40),
+        "standardized_name": random_text(20),
+        "job_url": f"https://www.linkedin.com/jobs/view/{job_id}",
+        "job_description": random_text(2000),
+        "job_type": "Full-time",
+        "job_functions": "Engineering|Information Technology",
+        "job_experience_level": random.choice(["Entry level", "Associate", "Mid-Senior level"]),
+        "job_views": random.randint(0, 5000),
+        "company_id": random.randint(1, 10000),
+    }
+
+def synthetic_company(company_id):
+    return {
+        "company_id": company_id,
+        "company_name": random_text(20),
+        "company_image_url": f"https://media.licdn.com/{company_id}.png",
+        "company_description": random_text(800),
+        "company_staff_count": random.randint(1, 100000),
+        "company_url": f"https://www.linkedin.com/company/{company_id}",
+        "company_follower_count": random.randint(0, 1000000),
+        "company_industries": "Software Development",
+    }
+
+def write_file(path, columns, rows):
+    delete_file(path)
+    writer, file = get_file_handle(path, columns)
+    for row in rows:
+        writer.writerow(prep_row(row, columns))
+    file.close()
+
+def run(rows_options, loader_names, data_dir, server_dir):
+    data_dir.mkdir(parents=True, exist_ok=True)
+    datasets = [
+        ("lk_staging_job_details", JOB_COLS, synthetic_job),
+        ("lk_staging_companies", COMPANY_COLS, synthetic_company),
+    ]
+    print(f"{'table':<24}{'rows':>10}{'loader':>10}{'seconds':>10}{'rows/s':>12}")
+    for rows in rows_options:
+        for table_name, columns, factory in datasets:
+            file_name = f"{table_name}_{rows}.csv"
+            local_path = data_dir / file_name
+            write_file(local_path, columns, (factory(i) for i in range(1, rows + 1)))
+            server_path = f"{server_dir}/{file_name}" if server_dir else str(local_path.absolute())
+
+            for loader_name in loader_names:
+                execute_sql(f"DELETE FROM {table_name} WHERE etl_id = {BENCH_ETL_ID}")
+                loader = LOADERS[loader_name]()
+                started = time.perf_counter()
+                loader.load(table_name, columns, str(local_path.absolute()), server_path, constants={"etl_id": BENCH_ETL_ID})
+                elapsed = time.perf_counter() - started
+                print(f"{table_name:<24}{rows:>10}{loader_name:>10}{elapsed:>10.2f}{rows / elapsed:>12.0f}")
+            execute_sql(f"DELETE FROM {table_name} WHERE etl_id = {BENCH_ETL_ID}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--loaders", nargs="+", choices=list(LOADERS), default=list(LOADERS))
+    parser.add_argument("--data-dir", type=Path, default=Path("tmp_data") / "bench")
+    parser.add_argument("--server-dir", default=None, help="path of --data-dir as seen by the MySQL server")
+    args = parser.parse_args()
+    run(args.rows, args.loaders, args.data_dir, args.server_dir)
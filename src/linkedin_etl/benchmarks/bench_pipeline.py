@@ -0,0 +1,160 @@
+"""Run the whole ETL (main.main) against the fake LinkedIn API and report its throughput.
+
+Run from src/linkedin_etl against a throwaway, migrated MySQL database; no network access is needed:
+
+    DATABASE_URL=mysql+pymysql://... python -m benchmarks.bench_pipeline --configs 4 --jobs-per-search 1000 --label baseline
+    DATABASE_URL=mysql+pymysql://... python -m benchmarks.bench_pipeline --configs 4 --jobs-per-search 1000 --label change
+    python -m benchmarks.bench_pipeline --compare tmp_data/bench/pipeline_baseline.json tmp_data/bench/pipeline_change.json
+
+Every run inserts --configs search configs (etl_id -101, -102, ...) pointing at an in-process
+fake API, runs the ETL, prints jobs/sec with the per-stage breakdown and removes the synthetic
+rows again (--keep leaves them for inspection). Any ETL_* / HTTP_* / BULK_LOADER / DIFF_MODE
+variable set in the environment is honoured, which is how alternative settings are compared.
+
+The load SQL is MySQL specific (LOAD DATA, INSERT IGNORE, ON DUPLICATE KEY UPDATE), so SQLite
+is not supported.
+"""
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+from benchmarks.fake_linkedin_api import FAKE_COMPANY_ID_OFFSET, FAKE_ID_OFFSET, MAX_COMPANY_ID, add_config_arguments, config_from_args, start_server
+
+BENCH_ETL_ID_START = -101
+BENCH_SEARCH_URL = "{base_url}/voyager/api/search/dash/clusters?q=all&query=(keywords:bench{n},origin:JOB_SEARCH_PAGE_JOB_FILTER)"
+
+# Defaults that keep the run local and fast; anything already in the environment wins
+BENCH_ENV = {
+    "LINKEDIN_REQUESTS_PER_SECOND": "1000",
+    "LINKEDIN_REQUESTS_BURST": "50",
+    "HTTP_BACKOFF_FACTOR": "0.05",
+    "BULK_LOADER": "insert",
+    "METRICS_FILE": str(Path("tmp_data") / "bench" / "pipeline_metrics.jsonl"),
+}
+
+def bench_etl_ids(configs):
+    return [BENCH_ETL_ID_START - n for n in range(configs)]
+
+def seed_configs(engine, text, base_url, configs):
+    with engine.begin() as conn:
+        pending = conn.execute(text(
+            "SELECT COUNT(*) FROM lk_etl_status "
+            "WHERE (last_updated < CURDATE() OR last_updated IS NULL) AND COALESCE(etl_url, '') <> '' "
+            "AND etl_id > :first_bench_id"
+        ), {"first_bench_id": BENCH_ETL_ID_START}).scalar()
+        if pending:
+            # main() processes every pending config, real searches would hit the fake API too
+            raise SystemExit(f"{pending} real search configs are pending, run the benchmark on a throwaway database")
+        conn.execute(text(
+            "INSERT INTO lk_etl_status (etl_id, etl_search, etl_url, is_running, last_updated, country, city) "
+            "VALUES (:etl_id, :etl_search, :etl_url, 0, NULL, 'Switzerland', :city)"
+        ), [
+            {
+                "etl_id": etl_id,
+                "etl_search": f"bench{n}",
+                "etl_url": BENCH_SEARCH_URL.format(base_url=base_url, n=n),
+                "city": f"Benchmark {n}",
+            }
+            for n, etl_id in enumerate(bench_etl_ids(configs))
+        ])
+
+def cleanup(engine, text, etl_ids):
+    ids = ", ".join(str(etl_id) for etl_id in etl_ids)
+    id_range = f"BETWEEN {FAKE_ID_OFFSET} AND {FAKE_ID_OFFSET + 999_999_999_999}"
+    with engine.begin() as conn:
+        conn.execute(text(f"DELETE FROM lk_jobs WHERE etl_id IN ({ids})"))
+        conn.execute(text(f"DELETE FROM lk_job_first_seen WHERE job_id {id_range}"))
+        conn.execute(text(f"DELETE FROM lk_companies WHERE company_id BETWEEN {FAKE_COMPANY_ID_OFFSET} AND {MAX_COMPANY_ID}"))
+        conn.execute(text(f"DELETE FROM lk_job_daily_rollup WHERE etl_id IN ({ids})"))
+        conn.execute(text(f"DELETE FROM lk_search_history WHERE etl_search_id IN ({ids})"))
+        for table in ("lk_staging_jobs", "lk_staging_job_details", "lk_staging_companies"):
+            conn.execute(text(f"DELETE FROM {table} WHERE etl_id IN ({ids})"))
+        conn.execute(text(f"DELETE FROM lk_etl_status WHERE etl_id IN ({ids})"))
+
+def stage_breakdown(snapshot):
+    stages = {}
+    for histogram in snapshot["histograms"]:
+        if histogram["name"] == "stage_seconds":
+            stages[histogram["labels"]["stage"]] = {"count": histogram["count"], "seconds": round(histogram["sum"], 3)}
+    return dict(sorted(stages.items(), key=lambda item: -item[1]["seconds"]))
+
+def counter_total(snapshot, name):
+    return sum(counter["value"] for counter in snapshot["counters"] if counter["name"] == name)
+
+def run(args):
+    fake_config = config_from_args(args)
+    server, base_url = start_server(fake_config)
+    os.environ["LINKEDIN_BASE_URL"] = base_url
+    for name, value in BENCH_ENV.items():
+        os.environ.setdefault(name, value)
+
+    # Imported late: api/api.py and friends read their settings from the environment at import time
+    from sqlalchemy import text
+    import main
+    from models.session import engine
+    from utils.metrics import METRICS
+
+    etl_ids = bench_etl_ids(args.configs)
+    cleanup(engine, text, etl_ids)
+    seed_configs(engine, text, base_url, args.configs)
+    started = time.perf_counter()
+    try:
+        main.main(parallel_configs=args.parallel, search_mode=args.search_mode)
+    finally:
+        elapsed = time.perf_counter() - started
+        if not args.keep:
+            cleanup(engine, text, etl_ids)
+        server.shutdown()
+
+    snapshot = METRICS.snapshot()
+    jobs = counter_total(snapshot, "job_details_fetched_total")
+    report = {
+        "label": args.label,
+        "configs": args.configs,
+        "jobs_per_search": args.jobs_per_search,
+        "seconds": round(elapsed, 3),
+        "jobs_fetched": jobs,
+        "jobs_per_second": round(jobs / elapsed, 2) if elapsed else 0,
+        "http_requests": counter_total(snapshot, "http_responses_total"),
+        "fake_api": fake_config.stats,
+        "stages": stage_breakdown(snapshot),
+    }
+
+    print(f"{jobs} jobs in {elapsed:.1f}s: {report['jobs_per_second']} jobs/s, fake API served {fake_config.stats}")
+    print(f"{'stage':<30}{'runs':>6}{'seconds':>10}")
+    for name, stage in report["stages"].items():
+        print(f"{name:<30}{stage['count']:>6}{stage['seconds']:>10.2f}")
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    output_path = args.output_dir / f"pipeline_{args.label}.json"
+    output_path.write_text(json.dumps(report, indent=2))
+    print(f"Report written to {output_path}")
+
+def compare(before_path, after_path):
+    before = json.loads(Path(before_path).read_text())
+    after = json.loads(Path(after_path).read_text())
+    print(f"jobs/s: {before['jobs_per_second']} ({before['label']}) -> {after['jobs_per_second']} ({after['label']})")
+    print(f"{'stage':<30}{before['label'] + ' s':>14}{after['label'] + ' s':>14}")
+    for name in dict.fromkeys(list(before["stages"]) + list(after["stages"])):
+        before_s = before["stages"].get(name, {}).get("seconds", 0)
+        after_s = after["stages"].get(name, {}).get("seconds", 0)
+        print(f"{name:<30}{before_s:>14.2f}{after_s:>14.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--label", default="run", help="name of this report, e.g. baseline/change")
+    parser.add_argument("--configs", type=int, default=2, help="number of synthetic search configs")
+    parser.add_argument("--parallel", type=int, default=1, help="passed to main.main(parallel_configs=...)")
+    parser.add_argument("--search-mode", choices=["full", "incremental"], default="full")
+    parser.add_argument("--keep", action="store_true", help="leave the synthetic rows in the database")
+    parser.add_argument("--output-dir", type=Path, default=Path("tmp_data") / "bench")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="print the difference between two reports")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+    else:
+        run(args)
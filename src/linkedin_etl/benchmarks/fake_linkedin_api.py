@@ -0,0 +1,195 @@
+"""Local stand-in for the LinkedIn voyager endpoints used by api/api.py.
+
+Serves search pages and job details with configurable latency, 5xx and 429 rates, either
+synthetic (deterministic per job id) or replayed from recorded responses:
+
+    python -m benchmarks.fake_linkedin_api --port 8765 --jobs-per-search 500 --latency-ms 80 --rate-429 0.02
+
+then run the ETL with LINKEDIN_BASE_URL=http://127.0.0.1:8765 and search configs whose
+etl_url points at the same host (benchmarks/bench_pipeline.py does both).
+
+--fixtures DIR replays recorded JSON: DIR/search_<start>.json for search pages and
+DIR/job_<job_id>.json for details; anything missing falls back to synthetic data.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+# Far above real LinkedIn ids, same idea as the other benchmarks
+FAKE_ID_OFFSET = 8_000_000_000_000
+# company_id is an INT column, so company ids stay below 2**31 (and above bench_dashboard_queries' range)
+FAKE_COMPANY_ID_OFFSET = 2_100_000_000
+MAX_COMPANY_ID = 2**31 - 1
+EXPERIENCE_LEVELS = ["Entry level", "Associate", "Mid-Senior level", "Director"]
+TITLES = ["Data Engineer", "Senior Data Engineer", "Analytics Engineer", "Data Platform Engineer"]
+
+class FakeApiConfig:
+    def __init__(self, jobs_per_search=500, overlap=0.5, companies=200, latency_ms=50.0, jitter_ms=20.0,
+                 error_rate=0.0, rate_429=0.0, retry_after=0, description_chars=3000, fixtures=None, seed=0):
+        self.jobs_per_search = jobs_per_search
+        # Share of each search's ids that also appear in the other searches
+        self.overlap = overlap
+        if FAKE_COMPANY_ID_OFFSET + companies - 1 > MAX_COMPANY_ID:
+            raise ValueError(f"at most {MAX_COMPANY_ID - FAKE_COMPANY_ID_OFFSET + 1} companies fit in an INT company_id")
+        self.companies = companies
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.description_chars = description_chars
+        self.fixtures = Path(fixtures) if fixtures else None
+        self.seed = seed
+        self.stats = {"search": 0, "detail": 0, "429": 0, "5xx": 0}
+        self.lock = threading.Lock()
+
+    def count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+def search_job_ids(config, search_key, start, count):
+    # The first `overlap` share of every search is the same ids, the rest is specific to the search
+    shared = int(config.jobs_per_search * config.overlap)
+    search_offset = zlib.crc32(search_key.encode()) % 10_000 * 1_000_000
+    ids = []
+    for position in range(start, min(start + count, config.jobs_per_search)):
+        if position < shared:
+            ids.append(FAKE_ID_OFFSET + position)
+        else:
+            ids.append(FAKE_ID_OFFSET + search_offset + position)
+    return ids
+
+def search_page(config, search_key, start, count):
+    if config.fixtures and (config.fixtures / f"search_{start}.json").is_file():
+        return json.loads((config.fixtures / f"search_{start}.json").read_text())
+    return {
+        "paging": {"total": config.jobs_per_search, "start": start, "count": count},
+        "elements": [
+            {"jobCardUnion": {"jobPostingCard": {"preDashNormalizedJobPostingUrn": f"urn:li:fs_normalized_jobPosting:{job_id}"}}}
+            for job_id in search_job_ids(config, search_key, start, count)
+        ],
+    }
+
+def job_detail(config, job_id):
+    if config.fixtures and (config.fixtures / f"job_{job_id}.json").is_file():
+        return json.loads((config.fixtures / f"job_{job_id}.json").read_text())
+    rng = random.Random(config.seed * 1_000_003 + job_id)
+    company_id = FAKE_COMPANY_ID_OFFSET + rng.randrange(config.companies)
+    title = rng.choice(TITLES)
+    words = ["spark", "airflow", "python", "sql", "kafka", "dbt", "cloud", "pipelines", "team", "data"]
+    description = " ".join(rng.choice(words) for _ in range(config.description_chars // 6))
+    return {
+        "jobPostingId": job_id,
+        "title": f"{title} ({job_id % 1000})",
+        "standardizedTitleResolutionResult": {"localizedName": title},
+        "jobPostingUrl": f"https://www.linkedin.com/jobs/view/{job_id}",
+        "description": {"text": description},
+        "formattedEmploymentStatus": "Full-time",
+        "formattedJobFunctions": ["Engineering", "Information Technology"],
+        "formattedExperienceLevel": rng.choice(EXPERIENCE_LEVELS),
+        "views": rng.randint(0, 5000),
+        "companyDetails": {
+            "com.linkedin.voyager.deco.jobs.web.shared.WebJobPostingCompany": {
+                "companyResolutionResult": {
+                    "entityUrn": f"urn:li:fs_normalized_company:{company_id}",
+                    "universalName": f"company-{company_id % 100000}",
+                    "description": f"Synthetic company {company_id}",
+                    "staffCount": 10 + company_id % 5000,
+                    "url": f"https://www.linkedin.com/company/{company_id}",
+                    "followingInfo": {"followerCount": company_id % 100000},
+                    "industries": ["Software Development"],
+                }
+            }
+        },
+    }
+
+def make_handler(config):
+    class FakeLinkedInHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def send_json(self, status, payload, headers=None):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            delay = max(0.0, config.latency_ms + random.uniform(-config.jitter_ms, config.jitter_ms)) / 1000
+            time.sleep(delay)
+
+            roll = random.random()
+            if roll < config.rate_429:
+                config.count("429")
+                return self.send_json(429, {"status": 429}, {"Retry-After": str(config.retry_after)})
+            if roll < config.rate_429 + config.error_rate:
+                config.count("5xx")
+                return self.send_json(503, {"status": 503})
+
+            parsed = urlparse(self.path)
+            if "/jobPostings/" in parsed.path:
+                config.count("detail")
+                job_id = int(parsed.path.rstrip("/").split("/")[-1])
+                return self.send_json(200, job_detail(config, job_id))
+
+            config.count("search")
+            query = parse_qs(parsed.query)
+            start = int(query.get("start", ["0"])[0])
+            count = int(query.get("count", ["50"])[0])
+            # Everything but the query tuple's sort option identifies the search
+            search_key = query.get("query", [""])[0].replace(",selectedFilters:(sortBy:List(DD))", "")
+            return self.send_json(200, search_page(config, search_key, start, count))
+
+    return FakeLinkedInHandler
+
+def start_server(config, host="127.0.0.1", port=0):
+    """Start the fake API in a daemon thread; returns (server, base_url)."""
+    server = ThreadingHTTPServer((host, port), make_handler(config))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+def add_config_arguments(parser):
+    parser.add_argument("--jobs-per-search", type=int, default=500)
+    parser.add_argument("--overlap", type=float, default=0.5, help="share of ids every search has in common")
+    parser.add_argument("--companies", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with a 503")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="share of requests answered with a 429")
+    parser.add_argument("--retry-after", type=int, default=0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--fixtures", default=None, help="directory of recorded search_<start>.json / job_<id>.json")
+    parser.add_argument("--seed", type=int, default=0)
+
+def config_from_args(args):
+    return FakeApiConfig(
+        jobs_per_search=args.jobs_per_search, overlap=args.overlap, companies=args.companies,
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        rate_429=args.rate_429, retry_after=args.retry_after, fixtures=args.fixtures, seed=args.seed,
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+    server, base_url = start_server(config_from_args(args), args.host, args.port)
+    print(f"Fake LinkedIn API listening on {base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,72 @@
+import datetime as dt
+import json
+import os
+from pathlib import Path
+
+JOURNAL_FILE = "checkpoint.jsonl"
+
+class CheckpointJournal:
+    """Append-only journal of the stages completed and job ids fetched for one etl_id.
+
+    Lives next to the config's temporary files, so cleaning tmp_data also resets it.
+    """
+    def __init__(self, directory):
+        self.path = Path(directory) / JOURNAL_FILE
+        self.run_date = None
+        self.stages = {}
+        self.fetched_ids = set()
+        if self.path.exists():
+            self._replay()
+
+    def _replay(self):
+        with open(self.path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash can leave a torn last line; everything before it is still valid
+                    continue
+                if entry["type"] == "run":
+                    self.run_date = entry["date"]
+                elif entry["type"] == "stage":
+                    self.stages[entry["stage"]] = entry.get("data", {})
+                elif entry["type"] == "fetched":
+                    self.fetched_ids.update(entry["job_ids"])
+
+    def _append(self, entry):
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(entry) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+    def is_resumable(self):
+        # Only today's run is worth resuming, older search results are stale
+        return self.run_date == dt.date.today().isoformat()
+
+    def start(self):
+        self.reset()
+        self.run_date = dt.date.today().isoformat()
+        self._append({"type": "run", "date": self.run_date})
+
+    def is_done(self, stage):
+        return stage in self.stages
+
+    def stage_data(self, stage):
+        return self.stages.get(stage, {})
+
+    def mark_done(self, stage, **data):
+        self.stages[stage] = data
+        self._append({"type": "stage", "stage": stage, "data": data})
+
+    def record_fetched(self, job_ids):
+        job_ids = [str(job_id) for job_id in job_ids]
+        if not job_ids:
+            return
+        self.fetched_ids.update(job_ids)
+        self._append({"type": "fetched", "job_ids": job_ids})
+
+    def reset(self):
+        self.run_date = None
+        self.stages = {}
+        self.fetched_ids = set()
+        self.path.unlink(missing_ok=True)
@@ -1,19 +1,43 @@
 import os
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from pathlib import Path
 
 from api.api import get_jobs, get_job_details
-from database.load_tables import stage_table, load_tables, dump_missing_job_ids_to_file
-from filesystem.file_manager import delete_all_files, create_tmp_dir, get_file_handle, stream_file_lines
-from utils.data_cleaner import prep_row
-
+from database.load_tables import MERGE_MODE, stage_table, load_tables, dump_missing_job_ids_to_file, stream_known_job_ids, stream_company_fingerprints
+from database.rollups import fetch_affected_rollup_keys, refresh_daily_rollup
+from filesystem.file_manager import CsvRecordSink, delete_all_files, delete_file, create_tmp_dir, stream_file_lines
+from utils.company_cache import CompanyCache
+from utils.data_cleaner import prep_row, content_hash
+from utils.job_id_index import JobIdIndex
+from utils.metrics import METRICS
+
+# Every ETL config works in its own TMP_DIR/<etl_id> sub-directory so configs can run in parallel
 TMP_DIR = Path("tmp_data")
 
-IDS_FILE_CSV = TMP_DIR / "ids.csv"
+IDS_FILE_CSV = "ids.csv"
 IDS_FILE_COLUMNS = ["job_id"]
 
-MISSING_IDS_FILE_CSV = TMP_DIR / "missing_ids.csv"
+MISSING_IDS_FILE_CSV = "missing_ids.csv"
+
+# "full" walks the whole search, "incremental" (opt-in) stops paging once results are only known ids
+SEARCH_MODE = os.environ.get("SEARCH_MODE", "full")
+INCREMENTAL_STOP_PAGES = int(os.environ.get("INCREMENTAL_STOP_PAGES", 2))
+
+# "database" diffs ids through lk_staging_jobs and INTO OUTFILE, "memory" diffs them
+# in-process against the lk_jobs ids and works against a remote MySQL
+DIFF_MODE = os.environ.get("DIFF_MODE", "database")
+
+DETAIL_FETCH_WORKERS = int(os.environ.get("DETAIL_FETCH_WORKERS", 4))
+# How many fetched ids are journaled at once when a checkpoint is given (the CSVs are fsynced first)
+DETAIL_CHECKPOINT_EVERY = int(os.environ.get("DETAIL_CHECKPOINT_EVERY", 50))
 
-JOBS_CSV = TMP_DIR / "jobs.csv"
+# Skip companies whose lk_companies row is already up to date; each config always writes a company at most once
+COMPANY_CACHE = os.environ.get("COMPANY_CACHE", "1") == "1"
+
+# gzip jobs/companies files; only BULK_LOADER=insert can read them back
+CSV_GZIP = os.environ.get("CSV_GZIP", "0") == "1"
+
+JOBS_CSV = "jobs.csv"
 JOB_COLS = [
     "job_id",
     "job_name",
@@ -27,7 +51,7 @@ JOB_COLS = [
     "company_id",
 ]
 
-COMPANIES_CSV = TMP_DIR / "companies.csv"
+COMPANIES_CSV = "companies.csv"
 COMPANY_COLS = [
     "company_id",
     "company_name",
@@ -37,60 +61,175 @@ COMPANY_COLS = [
     "company_url",
     "company_follower_count",
     "company_industries",
+    "content_hash",
 ]
-
-def clean_temporary_data_directory():
-    print(f"Cleaning directory: {TMP_DIR}")
-    create_tmp_dir(TMP_DIR)
-    delete_all_files(TMP_DIR)
-
-def fetch_linkedin_job_ids(url):
-    ids_file_writer, ids_file = get_file_handle(IDS_FILE_CSV,IDS_FILE_COLUMNS)
-    print(f"Fetching jobs from URL: {url}")
-    total_jobs = 0
-
-    for jobs_page in get_jobs(url=url):
-        total_jobs = jobs_page["total_jobs"]
-        job_ids = jobs_page["jobs"]
-        for id_ in job_ids:
-            ids_file_writer.writerow({"job_id": id_})
-        ids_file.flush()
-
-    return total_jobs
-
-def fetch_missing_job_details():
-    jobs_file_writer, jobs_file = get_file_handle(JOBS_CSV,JOB_COLS)
-    companies_file_writer, companies_file = get_file_handle(COMPANIES_CSV,COMPANY_COLS)
-    print("Fetching job details")
-    for job_id in stream_file_lines(MISSING_IDS_FILE_CSV.absolute()):
-        job_information, company_information = get_job_details(job_id)
-
-        if job_information:
-            jobs_file_writer.writerow(prep_row(job_information, JOB_COLS))
-            jobs_file.flush()
-            
-        if company_information:
-            companies_file_writer.writerow(prep_row(company_information, COMPANY_COLS))
-            companies_file.flush()
-
-def load_job_ids_into_stage_table():
-    data_path = os.environ.get('CONTAINER_DATA_PATH')+"/ids.csv" if os.environ.get('CONTAINER_DATA_PATH') else IDS_FILE_CSV.absolute()
-    stage_table(data_path, "lk_staging_jobs", ",".join(IDS_FILE_COLUMNS))
-
-def load_jobs_into_stage_table():
-    data_path = os.environ.get('CONTAINER_DATA_PATH')+"/jobs.csv" if os.environ.get('CONTAINER_DATA_PATH') else JOBS_CSV.absolute()
-    stage_table(data_path, "lk_staging_job_details", ",".join(JOB_COLS))
-
-def load_companies_into_stage_table():
-    data_path = os.environ.get('CONTAINER_DATA_PATH')+"/companies.csv" if os.environ.get('CONTAINER_DATA_PATH') else COMPANIES_CSV.absolute()
-    stage_table(data_path, "lk_staging_companies", ",".join(COMPANY_COLS))
-
-def save_missing_job_ids_to_file():
-    data_path = os.environ.get('CONTAINER_DATA_PATH')+"/missing_ids.csv" if os.environ.get('CONTAINER_DATA_PATH') else MISSING_IDS_FILE_CSV.absolute()
-    dump_missing_job_ids_to_file(data_path)
-
-def load_datamart_tables(etl_id):
-    print("Loading tables")
-    load_tables(etl_id)
-    print("Finished ETL")
-
+# Follower counts change on every fetch, they are refreshed separately and left out of the fingerprint
+COMPANY_HASH_COLS = [col for col in COMPANY_COLS if col not in ("company_id", "company_follower_count", "content_hash")]
+
+def get_tmp_dir(etl_id):
+    return TMP_DIR / str(etl_id)
+
+def get_data_path(etl_id, file_name):
+    # Path as seen by the MySQL server: CONTAINER_DATA_PATH is where TMP_DIR is mounted inside its container
+    if os.environ.get('CONTAINER_DATA_PATH'):
+        return f"{os.environ.get('CONTAINER_DATA_PATH')}/{etl_id}/{file_name}"
+    return (get_tmp_dir(etl_id) / file_name).absolute()
+
+def clean_temporary_data_directory(etl_id):
+    tmp_dir = get_tmp_dir(etl_id)
+    print(f"[etl {etl_id}] Cleaning directory: {tmp_dir}")
+    create_tmp_dir(tmp_dir)
+    delete_all_files(tmp_dir)
+
+def search_job_ids(etl_id, url, search_result, known_ids=None, incremental=True):
+    """Write every id returned by the search to ids.csv and yield them page by page.
+
+    search_result["total_jobs"] is kept up to date as pages arrive.
+    """
+    print(f"[etl {etl_id}] Fetching jobs from URL: {url}")
+
+    stop_ids = known_ids if incremental else None
+    # A resumed run repeats the search from scratch, so any partial file is replaced
+    with CsvRecordSink(get_tmp_dir(etl_id) / IDS_FILE_CSV, IDS_FILE_COLUMNS) as ids_sink:
+        for jobs_page in get_jobs(url=url, known_ids=stop_ids, stop_after_known_pages=INCREMENTAL_STOP_PAGES):
+            search_result["total_jobs"] = jobs_page["total_jobs"]
+            job_ids = jobs_page["jobs"]
+            for id_ in job_ids:
+                ids_sink.writerow({"job_id": id_})
+            yield job_ids
+
+def fetch_linkedin_job_ids(etl_id, url, known_ids=None, incremental=True):
+    search_result = {"total_jobs": 0}
+    for _ in search_job_ids(etl_id, url, search_result, known_ids, incremental):
+        pass
+    return search_result["total_jobs"]
+
+def stream_missing_job_ids(etl_id, url, search_result, known_ids, incremental=True):
+    seen_ids = set()
+    for job_ids in search_job_ids(etl_id, url, search_result, known_ids, incremental):
+        for job_id in job_ids:
+            if job_id in known_ids or job_id in seen_ids:
+                continue
+            seen_ids.add(job_id)
+            METRICS.inc("missing_ids_total")
+            yield str(job_id)
+
+def count_missing_job_ids(job_ids):
+    # Database mode reads the ids back from missing_ids.csv, stream_missing_job_ids counts them in memory mode
+    for job_id in job_ids:
+        METRICS.inc("missing_ids_total")
+        yield job_id
+
+def load_known_job_ids(search_mode=SEARCH_MODE, diff_mode=DIFF_MODE):
+    if search_mode != "incremental" and diff_mode != "memory":
+        return None
+    known_ids = JobIdIndex(stream_known_job_ids())
+    print(f"Loaded {len(known_ids)} known job ids")
+    return known_ids
+
+def load_company_fingerprints(merge_mode=MERGE_MODE):
+    # MERGE_MODE=full rewrites every staged company, so every company has to be staged
+    if not COMPANY_CACHE or merge_mode != "hash":
+        return None
+    fingerprints = dict(stream_company_fingerprints())
+    print(f"Loaded {len(fingerprints)} company fingerprints")
+    return fingerprints
+
+def fetch_job_details_concurrently(job_ids, workers=DETAIL_FETCH_WORKERS):
+    """Yield (job_id, get_job_details result) while keeping at most 2 * workers requests in flight.
+
+    Results come back in completion order; the caller stays the single writer.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+        for job_id in job_ids:
+            pending[executor.submit(get_job_details, job_id)] = job_id
+            if len(pending) >= workers * 2:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future.result()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+
+def prepare_record(information, columns, hash_columns):
+    row = prep_row(information, columns)
+    row["content_hash"] = content_hash(row, hash_columns)
+    return row
+
+def fetch_missing_job_details(etl_id, checkpoint=None, missing_ids=None, company_fingerprints=None):
+    tmp_dir = get_tmp_dir(etl_id)
+    print(f"[etl {etl_id}] Fetching job details with {DETAIL_FETCH_WORKERS} workers")
+    if missing_ids is None:
+        missing_ids = count_missing_job_ids(stream_file_lines((tmp_dir / MISSING_IDS_FILE_CSV).absolute()))
+    if checkpoint is not None and checkpoint.fetched_ids:
+        print(f"[etl {etl_id}] Resuming, skipping {len(checkpoint.fetched_ids)} already fetched ids")
+        missing_ids = (job_id for job_id in missing_ids if job_id not in checkpoint.fetched_ids)
+
+    # append=True continues the files of an interrupted run; a fresh run starts from an empty directory
+    with CsvRecordSink(tmp_dir / JOBS_CSV, JOB_COLS, append=True, compress=CSV_GZIP) as jobs_sink, \
+         CsvRecordSink(tmp_dir / COMPANIES_CSV, COMPANY_COLS, append=True, compress=CSV_GZIP) as companies_sink:
+
+        company_cache = CompanyCache(company_fingerprints)
+        fetched_ids = []
+        for job_id, (job_information, company_information) in fetch_job_details_concurrently(missing_ids):
+
+            if job_information:
+                jobs_sink.writerow(prep_row(job_information, JOB_COLS))
+                METRICS.inc("job_details_fetched_total")
+
+            if company_information:
+                METRICS.inc("companies_fetched_total")
+                company_row = prepare_record(company_information, COMPANY_COLS, COMPANY_HASH_COLS)
+                if company_cache.should_write(company_row):
+                    companies_sink.writerow(company_row)
+                    METRICS.inc("companies_written_total")
+
+            # Ids are journaled only once their rows are fsynced, a crash can at worst refetch them
+            fetched_ids.append(job_id)
+            if checkpoint is not None and len(fetched_ids) >= DETAIL_CHECKPOINT_EVERY:
+                jobs_sink.checkpoint()
+                companies_sink.checkpoint()
+                checkpoint.record_fetched(fetched_ids)
+                fetched_ids = []
+
+        jobs_sink.checkpoint()
+        companies_sink.checkpoint()
+        if checkpoint is not None:
+            checkpoint.record_fetched(fetched_ids)
+    print(f"[etl {etl_id}] Saw {len(company_cache)} distinct companies")
+
+def fetch_job_ids_and_missing_details(etl_id, url, known_ids, checkpoint=None, incremental=True, company_fingerprints=None):
+    # Missing ids are found while the search is still paging, so detail requests start right away
+    search_result = {"total_jobs": 0}
+    missing_ids = stream_missing_job_ids(etl_id, url, search_result, known_ids, incremental)
+    fetch_missing_job_details(etl_id, checkpoint, missing_ids, company_fingerprints)
+    return search_result["total_jobs"]
+
+def _stage_file(etl_id, file_name, table_name, columns, uow=None, compressed=False):
+    if compressed:
+        file_name = f"{file_name}.gz"
+    local_path = (get_tmp_dir(etl_id) / file_name).absolute()
+    stage_table(table_name, columns, str(local_path), get_data_path(etl_id, file_name), etl_id, uow=uow)
+
+def load_job_ids_into_stage_table(etl_id, uow=None):
+    _stage_file(etl_id, IDS_FILE_CSV, "lk_staging_jobs", IDS_FILE_COLUMNS, uow)
+
+def load_jobs_into_stage_table(etl_id, uow=None):
+    _stage_file(etl_id, JOBS_CSV, "lk_staging_job_details", JOB_COLS, uow, CSV_GZIP)
+
+def load_companies_into_stage_table(etl_id, uow=None):
+    _stage_file(etl_id, COMPANIES_CSV, "lk_staging_companies", COMPANY_COLS, uow, CSV_GZIP)
+
+def save_missing_job_ids_to_file(etl_id):
+    # INTO OUTFILE refuses to overwrite a file left behind by an interrupted run
+    delete_file(get_tmp_dir(etl_id) / MISSING_IDS_FILE_CSV)
+    dump_missing_job_ids_to_file(get_data_path(etl_id, MISSING_IDS_FILE_CSV), etl_id)
+
+def load_datamart_tables(etl_id, uow=None):
+    print(f"[etl {etl_id}] Loading tables")
+    rollup_keys = fetch_affected_rollup_keys(etl_id, uow)
+    load_tables(etl_id, uow)
+    refresh_daily_rollup(rollup_keys, uow)
+    print(f"[etl {etl_id}] Finished ETL")
@@ -0,0 +1,156 @@
+import os
+import shutil
+import time
+from pathlib import Path
+
+from sqlalchemy import text
+
+from models.session import engine
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# Unset disables the snapshot; the dashboard reads it when ANALYTICS_BACKEND=duckdb
+ANALYTICS_SNAPSHOT_DIR = os.environ.get("ANALYTICS_SNAPSHOT_DIR")
+# Older snapshots are kept for dashboards still reading them
+ANALYTICS_SNAPSHOT_KEEP = int(os.environ.get("ANALYTICS_SNAPSHOT_KEEP", 2))
+SNAPSHOT_BATCH_SIZE = int(os.environ.get("SNAPSHOT_BATCH_SIZE", 50000))
+# Name of the file holding the directory of the latest complete snapshot
+CURRENT_FILE = "CURRENT"
+
+def _snapshot_tables():
+    # table -> (query, schema, partition column); wide text columns stay in MySQL
+    return {
+        "lk_jobs": (
+            """
+            SELECT job_id, job_name, standardized_name, job_url, job_type, job_views,
+                   job_experience_level, etl_id, company_id, created_at, last_updated,
+                   DATE(last_updated) AS last_updated_date
+            FROM lk_jobs
+            WHERE last_updated IS NOT NULL
+            """,
+            pa.schema([
+                ("job_id", pa.int64()),
+                ("job_name", pa.string()),
+                ("standardized_name", pa.string()),
+                ("job_url", pa.string()),
+                ("job_type", pa.string()),
+                ("job_views", pa.int64()),
+                ("job_experience_level", pa.string()),
+                ("etl_id", pa.int64()),
+                ("company_id", pa.int64()),
+                ("created_at", pa.timestamp("us")),
+                ("last_updated", pa.timestamp("us")),
+                ("last_updated_date", pa.date32()),
+            ]),
+            "last_updated_date",
+        ),
+        "lk_companies": (
+            """
+            SELECT company_id, company_name, company_image_url, company_staff_count,
+                   company_url, company_follower_count, company_industries
+            FROM lk_companies
+            """,
+            pa.schema([
+                ("company_id", pa.int64()),
+                ("company_name", pa.string()),
+                ("company_image_url", pa.string()),
+                ("company_staff_count", pa.int64()),
+                ("company_url", pa.string()),
+                ("company_follower_count", pa.string()),
+                ("company_industries", pa.string()),
+            ]),
+            None,
+        ),
+        "lk_etl_status": (
+            "SELECT etl_id, etl_search, last_updated, country, city FROM lk_etl_status",
+            pa.schema([
+                ("etl_id", pa.int64()),
+                ("etl_search", pa.string()),
+                ("last_updated", pa.date32()),
+                ("country", pa.string()),
+                ("city", pa.string()),
+            ]),
+            None,
+        ),
+        "lk_job_daily_rollup": (
+            """
+            SELECT rollup_date, etl_id, city, job_experience_level, country, job_count, new_jobs, updated_jobs
+            FROM lk_job_daily_rollup
+            """,
+            pa.schema([
+                ("rollup_date", pa.date32()),
+                ("etl_id", pa.int64()),
+                ("city", pa.string()),
+                ("job_experience_level", pa.string()),
+                ("country", pa.string()),
+                ("job_count", pa.int64()),
+                ("new_jobs", pa.int64()),
+                ("updated_jobs", pa.int64()),
+            ]),
+            None,
+        ),
+    }
+
+def _write_table(conn, table_dir, sql, schema, partition_col):
+    result = conn.execution_options(stream_results=True).execute(text(sql))
+    rows_written = 0
+    writer = None
+    table_dir.mkdir(parents=True)
+    for i, partition in enumerate(result.partitions(SNAPSHOT_BATCH_SIZE)):
+        batch = pa.Table.from_pylist([dict(row._mapping) for row in partition], schema=schema)
+        rows_written += batch.num_rows
+        if partition_col:
+            # Hive layout (last_updated_date=YYYY-MM-DD/) lets DuckDB skip whole days on date filters
+            ds.write_dataset(
+                batch, table_dir, format="parquet",
+                partitioning=ds.partitioning(pa.schema([schema.field(partition_col)]), flavor="hive"),
+                basename_template=f"part-{i}-{{i}}.parquet",
+                existing_data_behavior="overwrite_or_ignore",
+            )
+        else:
+            if writer is None:
+                writer = pq.ParquetWriter(table_dir / "data.parquet", schema)
+            writer.write_table(batch)
+    if writer is not None:
+        writer.close()
+    elif rows_written == 0:
+        # Also for partitioned tables, DuckDB's read_parquet fails on a glob matching no file
+        pq.write_table(schema.empty_table(), table_dir / "data.parquet")
+    return rows_written
+
+def export_analytics_snapshot(snapshot_dir=ANALYTICS_SNAPSHOT_DIR, keep=ANALYTICS_SNAPSHOT_KEEP):
+    """Write the dashboard tables to a new Parquet snapshot and point CURRENT at it.
+
+    Readers only ever follow CURRENT, which is swapped once every file is in place.
+    """
+    if not snapshot_dir:
+        return None
+    if pa is None:
+        print("Skipping analytics snapshot, pyarrow is not installed")
+        return None
+
+    root = Path(snapshot_dir)
+    name = time.strftime("snapshot-%Y%m%d-%H%M%S")
+    target = root / name
+    started = time.perf_counter()
+    # One REPEATABLE READ transaction, every table is read from the same point in time
+    with engine.connect() as conn:
+        with conn.begin():
+            for table_name, (sql, schema, partition_col) in _snapshot_tables().items():
+                rows = _write_table(conn, target / table_name, sql, schema, partition_col)
+                print(f"Snapshot {table_name}: {rows} rows")
+
+    current_tmp = root / f"{CURRENT_FILE}.tmp"
+    current_tmp.write_text(name)
+    os.replace(current_tmp, root / CURRENT_FILE)
+    print(f"Published analytics snapshot {target} in {time.perf_counter() - started:.1f}s")
+
+    snapshots = sorted(path for path in root.glob("snapshot-*") if path.is_dir())
+    for old in snapshots[:-max(1, keep)]:
+        shutil.rmtree(old, ignore_errors=True)
+    return target
@@ -6,39 +6,49 @@ def fetch_etl_configs():
             etl_id
             , etl_url
         FROM lk_etl_status
-        WHERE last_updated < CURDATE() OR last_updated IS NULL
+        WHERE (last_updated < CURDATE() OR last_updated IS NULL)
+            -- Rows without a search URL (e.g. the dashboard benchmark's city) are not runnable
+            AND COALESCE(etl_url, '') <> ''
     """
     return execute_sql(sql)
 
-def change_etl_status_to_running(etl_id):
+def change_etl_status_to_running(etl_id, uow=None):
     sql = f"""
         UPDATE lk_etl_status
         SET is_running = true
         WHERE etl_id = {etl_id}
     """
-    execute_sql(sql)
+    execute_sql(sql, uow=uow)
 
-def change_etl_status_to_not_running(etl_id):
+def change_etl_status_to_not_running(etl_id, uow=None):
     sql = f"""
         UPDATE lk_etl_status
         SET is_running = false
         WHERE etl_id = {etl_id}
     """
-    execute_sql(sql)
+    execute_sql(sql, uow=uow)
 
-def change_etl_last_updated(etl_id):
+def change_etl_last_updated(etl_id, uow=None):
     sql = f"""
         UPDATE lk_etl_status
         SET last_updated = CURDATE()
         WHERE etl_id = {etl_id}
     """
-    execute_sql(sql)
+    execute_sql(sql, uow=uow)
 
-def update_total_jobs(etl_id, total_jobs):
+def update_total_jobs(etl_id, total_jobs, uow=None):
     sql = f"""
         INSERT INTO lk_search_history(etl_search_id, search_date, total_jobs)
         VALUES ({etl_id}, CURDATE(), {total_jobs})
         ON DUPLICATE KEY UPDATE
             total_jobs = {total_jobs}
     """
-    execute_sql(sql)
+    execute_sql(sql, uow=uow)
+
+def publish_data_version(uow=None):
+    # Dashboards key their query cache on MAX(version), a new row invalidates it
+    sql = """
+        INSERT INTO lk_data_version (published_at)
+        VALUES (NOW())
+    """
+    execute_sql(sql, uow=uow)
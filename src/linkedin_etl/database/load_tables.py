@@ -5,34 +5,54 @@ from typing import Iterable, Optional
 
 from sqlalchemy import text
 
+from database.loaders import get_loader
+from database.unit_of_work import UnitOfWork, statement_kind
 from models.session import engine
+from utils.metrics import METRICS
 
-def execute_sql(sql: str, dry_run: bool = False):
+# "hash" only rewrites rows whose content_hash changed, "full" rewrites every staged row
+MERGE_MODE = os.environ.get("MERGE_MODE", "hash")
+
+def execute_sql(sql: str, dry_run: bool = False, uow: Optional[UnitOfWork] = None):
     if dry_run:
         print("\n-- DRY RUN --")
         print(sql)
         return None
-    with engine.begin() as conn:
+    if uow is not None:
+        return uow.execute(sql)
+    with METRICS.timer("sql_seconds", statement=statement_kind(sql)), engine.begin() as conn:
         return conn.execute(text(sql))
 
-def execute_many(sql_statements: Iterable[str], *, dry_run: bool = False):
+def execute_many(sql_statements: Iterable[str], *, dry_run: bool = False, uow: Optional[UnitOfWork] = None):
     for s in sql_statements:
-        execute_sql(s, dry_run=dry_run) 
+        execute_sql(s, dry_run=dry_run, uow=uow) 
 
-def stage_table(data_path, table_name, fields):
-    clean_sql_table = f"TRUNCATE TABLE {table_name}"
-    sql = f"""
-        LOAD DATA INFILE '{data_path}'
-        IGNORE
-        INTO TABLE {table_name} 
-        FIELDS TERMINATED BY ','
-        OPTIONALLY ENCLOSED BY '"'
-        LINES TERMINATED BY '\n'
-        IGNORE 1 LINES
-        ({fields});
-    """
-    execute_many(sql_statements=[clean_sql_table,sql], dry_run=True)
-    execute_many(sql_statements=[clean_sql_table,sql])
+def stream_known_job_ids(batch_size: int = 10000):
+    # Server-side cursor in primary key order, ids arrive sorted without buffering the whole table
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True).execute(text("SELECT job_id FROM lk_jobs ORDER BY job_id"))
+        for partition in result.partitions(batch_size):
+            for (job_id,) in partition:
+                yield job_id
+
+def stream_company_fingerprints(batch_size: int = 10000):
+    # Only the two narrow columns the merge compares, lk_companies descriptions stay on the server
+    sql = "SELECT company_id, content_hash, company_follower_count FROM lk_companies WHERE content_hash IS NOT NULL"
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True).execute(text(sql))
+        for partition in result.partitions(batch_size):
+            for company_id, company_hash, follower_count in partition:
+                yield company_id, (company_hash, str(follower_count))
+
+def stage_table(table_name, columns, local_path, server_path, etl_id, loader=None, uow=None):
+    # Staging tables are partitioned by etl_id so several configs can stage at the same time,
+    # a DELETE (unlike TRUNCATE) also stays inside the caller's transaction
+    clean_sql_table = f"DELETE FROM {table_name} WHERE etl_id = {etl_id}"
+    execute_sql(clean_sql_table, uow=uow)
+    loader = loader or get_loader()
+    rows_loaded = loader.load(table_name, columns, local_path, server_path, constants={"etl_id": etl_id}, uow=uow)
+    METRICS.inc("rows_staged_total", rows_loaded or 0, table=table_name)
+    print(f"[etl {etl_id}] Staged {rows_loaded} rows into {table_name} with {type(loader).__name__}")
 
 def dump_data_to_file(data_path, sql):
     sql = f"""
@@ -42,7 +62,6 @@ def dump_data_to_file(data_path, sql):
         ENCLOSED BY '"'
         LINES TERMINATED BY '\n';
     """
-    execute_sql(sql, True)
     execute_sql(sql)
  
 def load_id_files():
@@ -113,14 +132,26 @@ def stage_companies_file():
     execute_sql(truncate_sql)
     execute_sql(sql)
 
-def dump_missing_job_ids_to_file(data_path):
-    sql = """SELECT lsj.job_id
+def dump_missing_job_ids_to_file(data_path, etl_id):
+    sql = f"""SELECT lsj.job_id
         FROM lk_staging_jobs lsj 
         LEFT JOIN lk_jobs lj ON lsj.job_id = lj.job_id
-        WHERE lj.job_id IS NULL"""
+        WHERE lj.job_id IS NULL
+          AND lsj.etl_id = {etl_id}"""
     dump_data_to_file(data_path, sql)
 
-def load_tables(etl_id):
+def load_tables(etl_id, uow=None, merge_mode=MERGE_MODE):
+    # In "hash" mode companies whose content_hash did not change since the last merge are only
+    # touched through a narrow UPDATE, the wide columns (company_description...) are never rewritten.
+    # Jobs are always merged in full: only ids missing from lk_jobs are fetched, so they are new rows
+    changed_companies_filter = ""
+    if merge_mode == "hash":
+        changed_companies_filter = """
+          AND NOT EXISTS (
+            SELECT 1 FROM lk_companies lc
+            WHERE lc.company_id = lsc.company_id AND lc.content_hash = lsc.content_hash
+          )"""
+
     load_jobs_sql = f"""
         INSERT INTO lk_jobs (
             job_id,
@@ -158,6 +189,7 @@ def load_tables(etl_id):
             company_id,
             DATE(CURRENT_DATE()) AS last_updated
         FROM lk_staging_job_details lsjd
+        WHERE lsjd.etl_id = {etl_id}
         ON DUPLICATE KEY UPDATE
             job_name = VALUES(job_name),
             standardized_name = VALUES(standardized_name),
@@ -176,6 +208,15 @@ def load_tables(etl_id):
             last_updated = VALUES(last_updated);
     """
 
+    touch_unchanged_companies_sql = f"""
+        UPDATE lk_companies lc
+        JOIN lk_staging_companies lsc
+          ON lsc.company_id = lc.company_id
+         AND lsc.etl_id = {etl_id}
+        SET lc.company_follower_count = lsc.company_follower_count
+        WHERE lc.content_hash = lsc.content_hash;
+    """
+
     load_companies_sql = f"""
         INSERT INTO lk_companies (
             company_id,
@@ -185,7 +226,8 @@ def load_tables(etl_id):
             company_staff_count,
             company_url,
             company_follower_count,
-            company_industries
+            company_industries,
+            content_hash
         )
         SELECT DISTINCT
             company_id,
@@ -195,8 +237,10 @@ def load_tables(etl_id):
             company_staff_count,
             company_url,
             company_follower_count,
-            company_industries
+            company_industries,
+            content_hash
         FROM lk_staging_companies lsc
+        WHERE lsc.etl_id = {etl_id}{changed_companies_filter}
         ON DUPLICATE KEY UPDATE
             company_name = VALUES(company_name),
             company_image_url = VALUES(company_image_url),
@@ -204,7 +248,19 @@ def load_tables(etl_id):
             company_staff_count = VALUES(company_staff_count),
             company_url = VALUES(company_url),
             company_follower_count = VALUES(company_follower_count),
-            company_industries = VALUES(company_industries);
+            company_industries = VALUES(company_industries),
+            content_hash = VALUES(content_hash);
+    """
+    # Only the first merge that sees a job_id inserts it, later runs leave the date alone
+    record_first_seen_sql = f"""
+        INSERT IGNORE INTO lk_job_first_seen (job_id, first_seen_date)
+        SELECT DISTINCT lsjd.job_id, DATE(CURRENT_DATE())
+        FROM lk_staging_job_details lsjd
+        WHERE lsjd.etl_id = {etl_id};
     """
-    execute_sql(load_jobs_sql)
-    execute_sql(load_companies_sql)
\ No newline at end of file
+
+    execute_sql(record_first_seen_sql, uow=uow)
+    execute_sql(load_jobs_sql, uow=uow)
+    if merge_mode == "hash":
+        execute_sql(touch_unchanged_companies_sql, uow=uow)
+    execute_sql(load_companies_sql, uow=uow)
@@ -0,0 +1,93 @@
+import csv
+import os
+
+from sqlalchemy import text
+
+from database.unit_of_work import unit_of_work
+from filesystem.file_manager import open_text
+
+# "server": LOAD DATA INFILE, the file must be readable by the MySQL server (secure_file_priv)
+# "local":  LOAD DATA LOCAL INFILE, the client streams the file (local_infile must be enabled)
+# "insert": batched multi-row INSERT through executemany, works on any managed MySQL
+BULK_LOADER = os.environ.get("BULK_LOADER", "server")
+BULK_INSERT_BATCH_SIZE = int(os.environ.get("BULK_INSERT_BATCH_SIZE", 1000))
+
+class LoadDataInfileLoader:
+    keyword = "LOAD DATA INFILE"
+
+    def data_path(self, local_path, server_path):
+        return server_path
+
+    def load(self, table_name, columns, local_path, server_path, constants=None, uow=None):
+        if str(local_path).endswith(".gz"):
+            raise ValueError(f"LOAD DATA cannot read gzip files ({local_path}), use BULK_LOADER=insert or disable CSV_GZIP")
+        set_clause = ""
+        if constants:
+            set_clause = "SET " + ", ".join(f"{column} = {value}" for column, value in constants.items())
+        sql = f"""
+            {self.keyword} '{self.data_path(local_path, server_path)}'
+            IGNORE
+            INTO TABLE {table_name}
+            FIELDS TERMINATED BY ','
+            OPTIONALLY ENCLOSED BY '"'
+            LINES TERMINATED BY '\\n'
+            IGNORE 1 LINES
+            ({",".join(columns)})
+            {set_clause};
+        """
+        if uow is not None:
+            return uow.execute(sql).rowcount
+        with unit_of_work(f"load {table_name}") as own_uow:
+            return own_uow.execute(sql).rowcount
+
+class LocalLoadDataInfileLoader(LoadDataInfileLoader):
+    keyword = "LOAD DATA LOCAL INFILE"
+
+    def data_path(self, local_path, server_path):
+        return local_path
+
+class BatchInsertLoader:
+    def __init__(self, batch_size=BULK_INSERT_BATCH_SIZE):
+        self.batch_size = batch_size
+
+    def load(self, table_name, columns, local_path, server_path, constants=None, uow=None):
+        constants = constants or {}
+        all_columns = list(columns) + list(constants)
+        # pymysql rewrites executemany on INSERT ... VALUES into a single multi-row INSERT per batch
+        sql = text(f"""
+            INSERT IGNORE INTO {table_name} ({",".join(all_columns)})
+            VALUES ({",".join(f":{column}" for column in all_columns)})
+        """)
+        if uow is not None:
+            return self._insert_file(sql, columns, local_path, constants, uow)
+        with unit_of_work(f"load {table_name}") as own_uow:
+            return self._insert_file(sql, columns, local_path, constants, own_uow)
+
+    def _insert_file(self, sql, columns, local_path, constants, uow):
+        rows_loaded = 0
+        with open_text(local_path) as file:
+            # Same dialect the file was written with in file_manager.get_file_handle
+            reader = csv.reader(file, escapechar='\\')
+            next(reader, None)
+            batch = []
+            for row in reader:
+                if not row:
+                    continue
+                batch.append(dict(zip(columns, row), **constants))
+                if len(batch) >= self.batch_size:
+                    rows_loaded += uow.execute(sql, batch).rowcount
+                    batch = []
+            if batch:
+                rows_loaded += uow.execute(sql, batch).rowcount
+        return rows_loaded
+
+LOADERS = {
+    "server": LoadDataInfileLoader,
+    "local": LocalLoadDataInfileLoader,
+    "insert": BatchInsertLoader,
+}
+
+def get_loader(name=BULK_LOADER):
+    if name not in LOADERS:
+        raise ValueError(f"Unknown BULK_LOADER '{name}', expected one of: {', '.join(LOADERS)}")
+    return LOADERS[name]()
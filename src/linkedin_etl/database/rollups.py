@@ -0,0 +1,98 @@
+from database.load_tables import execute_sql
+
+def fetch_affected_rollup_keys(etl_id, uow=None):
+    # Merging moves re-seen jobs from their previous (date, etl_id) bucket to today's,
+    # so both sides have to be recomputed. Must run before load_tables.
+    sql = f"""
+        SELECT DISTINCT DATE(lj.last_updated), lj.etl_id
+        FROM lk_jobs lj
+        JOIN lk_staging_job_details lsjd
+          ON lsjd.job_id = lj.job_id
+         AND lsjd.etl_id = {etl_id}
+        WHERE lj.last_updated IS NOT NULL
+          AND lj.etl_id IS NOT NULL
+        UNION
+        SELECT CURRENT_DATE(), {etl_id}
+    """
+    return [(rollup_date, rollup_etl_id) for rollup_date, rollup_etl_id in execute_sql(sql, uow=uow)]
+
+def refresh_daily_rollup(rollup_keys, uow=None):
+    for rollup_date, etl_id in rollup_keys:
+        delete_sql = f"""
+            DELETE FROM lk_job_daily_rollup
+            WHERE rollup_date = '{rollup_date}'
+              AND etl_id = {etl_id}
+        """
+        insert_sql = f"""
+            INSERT INTO lk_job_daily_rollup (
+                rollup_date,
+                etl_id,
+                city,
+                job_experience_level,
+                country,
+                job_count,
+                new_jobs,
+                updated_jobs
+            )
+            SELECT
+                DATE(j.last_updated),
+                j.etl_id,
+                COALESCE(s.city, ''),
+                COALESCE(j.job_experience_level, ''),
+                MAX(s.country),
+                COUNT(*),
+                SUM(fs.first_seen_date = DATE(j.last_updated)),
+                SUM(fs.first_seen_date < DATE(j.last_updated))
+            FROM lk_jobs j
+            LEFT JOIN lk_etl_status s ON s.etl_id = j.etl_id
+            LEFT JOIN lk_job_first_seen fs ON fs.job_id = j.job_id
+            WHERE j.last_updated >= '{rollup_date}'
+              AND j.last_updated < '{rollup_date}' + INTERVAL 1 DAY
+              AND j.etl_id = {etl_id}
+            GROUP BY DATE(j.last_updated), j.etl_id, COALESCE(s.city, ''), COALESCE(j.job_experience_level, '')
+        """
+        execute_sql(delete_sql, uow=uow)
+        execute_sql(insert_sql, uow=uow)
+
+REFRESH_KPI_SUMMARY_SQL = """
+    INSERT INTO lk_kpi_summary (
+        summary_id,
+        last_load_ts,
+        total_jobs,
+        jobs_last_load,
+        companies_last_load,
+        job_name_completeness,
+        job_url_completeness,
+        company_id_completeness,
+        job_description_completeness,
+        refreshed_at
+    )
+    SELECT
+        1,
+        m.last_ts,
+        COUNT(*),
+        SUM(j.last_updated = m.last_ts),
+        COUNT(DISTINCT CASE WHEN j.last_updated = m.last_ts THEN j.company_id END),
+        AVG(j.job_name IS NOT NULL),
+        AVG(j.job_url IS NOT NULL),
+        AVG(j.company_id IS NOT NULL),
+        AVG(j.job_description IS NOT NULL),
+        NOW()
+    FROM lk_jobs j
+    CROSS JOIN (SELECT MAX(last_updated) AS last_ts FROM lk_jobs) m
+    GROUP BY m.last_ts
+    ON DUPLICATE KEY UPDATE
+        last_load_ts = VALUES(last_load_ts),
+        total_jobs = VALUES(total_jobs),
+        jobs_last_load = VALUES(jobs_last_load),
+        companies_last_load = VALUES(companies_last_load),
+        job_name_completeness = VALUES(job_name_completeness),
+        job_url_completeness = VALUES(job_url_completeness),
+        company_id_completeness = VALUES(company_id_completeness),
+        job_description_completeness = VALUES(job_description_completeness),
+        refreshed_at = VALUES(refreshed_at)
+"""
+
+def refresh_kpi_summary(uow=None):
+    # One pass over lk_jobs per run instead of six queries per Home page view
+    execute_sql(REFRESH_KPI_SUMMARY_SQL, uow=uow)
@@ -0,0 +1,48 @@
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import text
+
+from models.session import engine
+from utils.metrics import METRICS
+
+class UnitOfWork:
+    """Runs statements on a single pooled connection inside one transaction."""
+    def __init__(self, conn, name):
+        self.conn = conn
+        self.name = name
+        self.timings = []
+
+    def execute(self, sql, params=None):
+        started = time.perf_counter()
+        result = self.conn.execute(text(sql) if isinstance(sql, str) else sql, params or {})
+        elapsed = time.perf_counter() - started
+        self.timings.append((_describe(sql), elapsed))
+        METRICS.observe("sql_seconds", elapsed, statement=statement_kind(sql))
+        return result
+
+    def report(self):
+        total = sum(elapsed for _, elapsed in self.timings)
+        print(f"[{self.name}] {len(self.timings)} statements in {total:.2f}s")
+        for statement, elapsed in self.timings:
+            print(f"[{self.name}]   {elapsed:8.3f}s  {statement}")
+
+def statement_kind(sql):
+    # Low-cardinality label for SQL timings: INSERT, UPDATE, LOAD, SELECT...
+    words = str(sql).split()
+    return words[0].upper() if words else ""
+
+def _describe(sql):
+    # First meaningful line is enough to tell statements apart in the timing report
+    for line in str(sql).strip().splitlines():
+        if line.strip():
+            return line.strip()[:80]
+    return ""
+
+@contextmanager
+def unit_of_work(name="unit_of_work"):
+    """Commit every statement executed through the yielded UnitOfWork at once, or none of them."""
+    with engine.begin() as conn:
+        uow = UnitOfWork(conn, name)
+        yield uow
+    uow.report()
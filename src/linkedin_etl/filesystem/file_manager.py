@@ -1,9 +1,16 @@
 import os
 import csv
+import gzip
+import time
+import zlib
 
-def get_file_handle(file_location, columns):
-    file = open(file_location, "a", encoding="utf-8", newline="")
-    writer = csv.DictWriter(
+from utils.metrics import METRICS
+
+SINK_FLUSH_EVERY = int(os.environ.get("SINK_FLUSH_EVERY", 1000))
+SINK_FLUSH_INTERVAL = float(os.environ.get("SINK_FLUSH_INTERVAL", 5))
+
+def _dict_writer(file, columns):
+    return csv.DictWriter(
             file,
             fieldnames=columns,
             extrasaction="ignore",
@@ -11,26 +18,165 @@ def get_file_handle(file_location, columns):
             lineterminator="\n",
             escapechar='\\'
     )
-    writer.writeheader()
-    file.flush()
+
+def get_file_handle(file_location, columns):
+    file = open(file_location, "a", encoding="utf-8", newline="")
+    writer = _dict_writer(file, columns)
+    # Files are reopened in append mode when a run is resumed; only a new file gets a header
+    if file.tell() == 0:
+        writer.writeheader()
+        file.flush()
     return (writer, file)
 
+class CsvRecordSink:
+    """Buffered CSV writer that publishes its file atomically.
+
+    Rows go to `<file>.part` and are flushed every `flush_every` rows or
+    `flush_interval` seconds; `close` renames the part file to its final name,
+    so readers never see a half-written file. `checkpoint` additionally fsyncs,
+    anything written before it survives a crash. With `append` a leftover part
+    (or final) file is continued instead of replaced, which is how resumed runs
+    pick up where they stopped.
+    """
+    def __init__(self, file_location, columns, append=False, compress=False,
+                 flush_every=SINK_FLUSH_EVERY, flush_interval=SINK_FLUSH_INTERVAL):
+        self.path = f"{file_location}.gz" if compress else str(file_location)
+        self.part_path = f"{self.path}.part"
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+
+        if not append:
+            delete_file(self.part_path)
+        elif not os.path.isfile(self.part_path) and os.path.isfile(self.path):
+            os.replace(self.path, self.part_path)
+        delete_file(self.path)
+        if append and compress:
+            _rewrite_valid_gzip_prefix(self.part_path)
+        elif append:
+            _drop_torn_line(self.part_path)
+
+        is_new = not os.path.isfile(self.part_path) or os.path.getsize(self.part_path) == 0
+        if compress:
+            self._file = gzip.open(self.part_path, "at", encoding="utf-8", newline="")
+        else:
+            self._file = open(self.part_path, "a", encoding="utf-8", newline="", buffering=1024 * 1024)
+        self._writer = _dict_writer(self._file, columns)
+        if is_new:
+            self._writer.writeheader()
+
+    def writerow(self, row):
+        self._writer.writerow(row)
+        self.rows_written += 1
+        self._unflushed += 1
+        if self._unflushed >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self._file.flush()
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+
+    def checkpoint(self):
+        self.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self.checkpoint()
+        self._file.close()
+        os.replace(self.part_path, self.path)
+        METRICS.inc("csv_rows_written_total", self.rows_written, file=os.path.basename(self.path))
+        METRICS.inc("csv_bytes_written_total", os.path.getsize(self.path), file=os.path.basename(self.path))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            # Keep the part file around for a resumed run
+            self.flush()
+            self._file.close()
+
+def _rewrite_valid_gzip_prefix(file_location, chunk_size=1024 * 1024):
+    # A crash leaves the last gzip member unterminated and a member appended after it would make
+    # the whole file unreadable, so the readable full lines are recompressed into a fresh file
+    if not os.path.isfile(file_location):
+        return
+    tmp_location = f"{file_location}.tmp"
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    tail = b""
+    written = 0
+    corrupt = False
+    with open(file_location, "rb") as source, gzip.open(tmp_location, "wb") as target:
+        while not corrupt and (chunk := source.read(chunk_size)):
+            while chunk:
+                try:
+                    data = tail + decompressor.decompress(chunk)
+                except zlib.error:
+                    corrupt = True
+                    break
+                cut = data.rfind(b"\n") + 1
+                written += target.write(data[:cut])
+                tail = data[cut:]
+                if not decompressor.eof:
+                    break
+                # Next member of a file that was appended to before
+                chunk = decompressor.unused_data
+                decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    os.replace(tmp_location, file_location)
+    if not written:
+        # Not even the header survived, the sink starts the file over
+        delete_file(file_location)
+
+def _drop_torn_line(file_location):
+    # A crash mid-write can leave a partial last row; cut the file back to the last full line
+    if not os.path.isfile(file_location):
+        return
+    with open(file_location, "rb+") as file:
+        file.seek(0, os.SEEK_END)
+        size = file.tell()
+        position = size
+        while position > 0:
+            chunk_start = max(0, position - 4096)
+            file.seek(chunk_start)
+            chunk = file.read(position - chunk_start)
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                position = chunk_start + newline + 1
+                break
+            position = chunk_start
+        if position != size:
+            file.truncate(position)
+
+def open_text(file_location):
+    if str(file_location).endswith(".gz"):
+        return gzip.open(file_location, "rt", encoding="utf-8", newline="")
+    return open(file_location, "r", encoding="utf-8", newline="")
+
 def stream_file_lines(file_location):
-    with open(file_location, "r", encoding="utf-8", newline="") as file:
+    with open_text(file_location) as file:
         reader = csv.reader(file)
         for row in reader:
             if row:
                 yield row[0]
 
+def delete_file(file_location):
+    if os.path.isfile(file_location):
+        os.remove(file_location)
+
 def create_tmp_dir(tmp_directory):
     tmp_directory.mkdir(parents=True, exist_ok=True)
 
 def delete_all_files(directory):
     files = os.listdir(directory)
     print("Files:", files)
-    
+
     for file in files:
         file_path = os.path.join(directory, file)
         if os.path.isfile(file_path):
             os.remove(file_path)
-            print(f"Deleted: {file_path}")
\ No newline at end of file
+            print(f"Deleted: {file_path}")
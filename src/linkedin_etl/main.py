@@ -1,22 +1,102 @@
+import argparse
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-from data_processing.pipeline import clean_temporary_data_directory, fetch_linkedin_job_ids, load_job_ids_into_stage_table, save_missing_job_ids_to_file, fetch_missing_job_details, load_companies_into_stage_table, load_jobs_into_stage_table, load_datamart_tables
-from database.etl_status_manager import fetch_etl_configs, change_etl_status_to_running, change_etl_last_updated, change_etl_status_to_not_running, update_total_jobs
+from data_processing.checkpoint import CheckpointJournal
+from data_processing.pipeline import SEARCH_MODE, DIFF_MODE, get_tmp_dir, load_known_job_ids, load_company_fingerprints, fetch_job_ids_and_missing_details, clean_temporary_data_directory, fetch_linkedin_job_ids, load_job_ids_into_stage_table, save_missing_job_ids_to_file, fetch_missing_job_details, load_companies_into_stage_table, load_jobs_into_stage_table, load_datamart_tables
+from data_processing.snapshot import export_analytics_snapshot
+from database.etl_status_manager import fetch_etl_configs, change_etl_status_to_running, change_etl_last_updated, change_etl_status_to_not_running, update_total_jobs, publish_data_version
+from database.rollups import refresh_kpi_summary
+from database.unit_of_work import unit_of_work
+from filesystem.file_manager import create_tmp_dir
+from utils.metrics import METRICS, stage
 
-def main():
-    for etl_config in fetch_etl_configs():
-        etl_id, url = etl_config
-        change_etl_status_to_running(etl_id)
-        clean_temporary_data_directory()
-        total_jobs_found = fetch_linkedin_job_ids(url)
+ETL_PARALLEL_CONFIGS = int(os.environ.get("ETL_PARALLEL_CONFIGS", 1))
+# Configs fetch in parallel but load one at a time: their job/company ids overlap, and concurrent
+# upserts plus rollup DELETE+INSERT deadlock (1213) or time out on locks (1205) under InnoDB
+LOAD_LOCK = threading.Lock()
+
+def run_etl_config(etl_id, url, resume=False, known_ids=None, search_mode=SEARCH_MODE, company_fingerprints=None):
+    change_etl_status_to_running(etl_id)
+    create_tmp_dir(get_tmp_dir(etl_id))
+    checkpoint = CheckpointJournal(get_tmp_dir(etl_id))
+    if resume and checkpoint.is_resumable():
+        print(f"[etl {etl_id}] Resuming run, completed stages: {list(checkpoint.stages)}")
+    else:
+        clean_temporary_data_directory(etl_id)
+        checkpoint.start()
+
+    def run_stage(stage_name, func, *args, **kwargs):
+        if checkpoint.is_done(stage_name):
+            print(f"[etl {etl_id}] Skipping completed stage: {stage_name}")
+            return checkpoint.stage_data(stage_name).get("result")
+        with stage(stage_name, etl_id):
+            result = func(*args, **kwargs)
+        checkpoint.mark_done(stage_name, result=result)
+        return result
+
+    incremental = search_mode == "incremental"
+    if DIFF_MODE == "memory":
+        total_jobs_found = run_stage("fetch_job_ids_and_details", fetch_job_ids_and_missing_details, etl_id, url, known_ids, checkpoint, incremental, company_fingerprints)
+    else:
+        total_jobs_found = run_stage("fetch_job_ids", fetch_linkedin_job_ids, etl_id, url, known_ids, incremental)
+        if total_jobs_found:
+            run_stage("stage_job_ids", load_job_ids_into_stage_table, etl_id)
+            run_stage("save_missing_ids", save_missing_job_ids_to_file, etl_id)
+            run_stage("fetch_job_details", fetch_missing_job_details, etl_id, checkpoint, company_fingerprints=company_fingerprints)
+    # Staging, merge and status updates commit together, dashboards never see a half-loaded merge.
+    # Nothing here is checkpointed: a failure rolls everything back and a resume redoes it all.
+    with LOAD_LOCK, stage("load", etl_id), unit_of_work(f"etl {etl_id} load") as uow:
         if total_jobs_found:
-            update_total_jobs(etl_id, total_jobs_found)
-            load_job_ids_into_stage_table()
-            save_missing_job_ids_to_file()
-            fetch_missing_job_details()
-            load_jobs_into_stage_table()
-            load_companies_into_stage_table()
-            load_datamart_tables(etl_id)
-        change_etl_last_updated(etl_id)
-        change_etl_status_to_not_running(etl_id)
-
-main()
+            update_total_jobs(etl_id, total_jobs_found, uow)
+            load_jobs_into_stage_table(etl_id, uow)
+            load_companies_into_stage_table(etl_id, uow)
+            load_datamart_tables(etl_id, uow)
+        change_etl_last_updated(etl_id, uow)
+        change_etl_status_to_not_running(etl_id, uow)
+    # The config is finished, a later --resume must start from scratch
+    checkpoint.reset()
+
+def main(parallel_configs=ETL_PARALLEL_CONFIGS, resume=False, search_mode=SEARCH_MODE):
+    try:
+        run_all_configs(parallel_configs, resume, search_mode)
+    finally:
+        # Written even for failed runs, those are the ones worth looking at
+        METRICS.flush()
+
+def run_all_configs(parallel_configs, resume, search_mode):
+    etl_configs = list(fetch_etl_configs())
+    # Loaded once and shared read-only by every config
+    with stage("load_known_ids"):
+        known_ids = load_known_job_ids(search_mode) if etl_configs else None
+    with stage("load_company_fingerprints"):
+        company_fingerprints = load_company_fingerprints() if etl_configs else None
+    with ThreadPoolExecutor(max_workers=max(1, parallel_configs)) as executor:
+        futures = [executor.submit(run_etl_config, etl_id, url, resume, known_ids, search_mode, company_fingerprints) for etl_id, url in etl_configs]
+        # Wait for every config before surfacing the first failure, so one bad search
+        # does not leave the others half-processed
+        errors = [future.exception() for future in futures]
+    # Every config that finished committed new data, tell the dashboards once for the whole run
+    if any(error is None for error in errors):
+        # One pass over lk_jobs for the whole run instead of one per config
+        with stage("kpi_summary"):
+            refresh_kpi_summary()
+        # Snapshot first, so the new version is only announced once dashboards can read it
+        with stage("analytics_snapshot"):
+            export_analytics_snapshot()
+        publish_data_version()
+    for error in errors:
+        if error is not None:
+            raise error
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the LinkedIn ETL for every pending search config")
+    parser.add_argument("--parallel", type=int, default=ETL_PARALLEL_CONFIGS,
+                        help="number of search configs fetched concurrently, their loads still run one at a time")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue today's interrupted runs from their last checkpoint instead of starting over")
+    parser.add_argument("--search-mode", choices=["full", "incremental"], default=SEARCH_MODE,
+                        help="incremental stops paging once a search only returns known jobs (default: SEARCH_MODE or full)")
+    args = parser.parse_args()
+    main(parallel_configs=args.parallel, resume=args.resume, search_mode=args.search_mode)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, BigInteger, TEXT
+from sqlalchemy import Column, Integer, String, BigInteger, TEXT, CHAR
 from .base import Base
 
 class Companies(Base):
@@ -11,4 +11,5 @@ class Companies(Base):
     company_staff_count = Column("company_staff_count", Integer)
     company_url = Column("company_url", String(1000))
     company_follower_count = Column("company_follower_count", String(255))
-    company_industries = Column("company_industries",TEXT)
\ No newline at end of file
+    company_industries = Column("company_industries",TEXT)
+    content_hash = Column("content_hash", CHAR(32))
\ No newline at end of file
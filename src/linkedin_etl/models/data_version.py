@@ -0,0 +1,9 @@
+from sqlalchemy import Column, BigInteger, DateTime
+from sqlalchemy.sql import func
+from .base import Base
+
+class DataVersion(Base):
+    __tablename__ = "lk_data_version"
+
+    version = Column("version", BigInteger, primary_key = True, autoincrement = True)
+    published_at = Column("published_at", DateTime, default=func.now())
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, Date, PrimaryKeyConstraint
+from .base import Base
+
+class JobDailyRollup(Base):
+    __tablename__ = "lk_job_daily_rollup"
+
+    rollup_date = Column("rollup_date", Date)
+    etl_id = Column("etl_id", Integer)
+    city = Column("city", String(255))
+    job_experience_level = Column("job_experience_level", String(255))
+    country = Column("country", String(255))
+    job_count = Column("job_count", Integer)
+    new_jobs = Column("new_jobs", Integer)
+    updated_jobs = Column("updated_jobs", Integer)
+
+    __table_args__ = (
+        PrimaryKeyConstraint('rollup_date', 'etl_id', 'city', 'job_experience_level'),
+    )
@@ -0,0 +1,8 @@
+from sqlalchemy import Column, BigInteger, Date
+from .base import Base
+
+class JobFirstSeen(Base):
+    __tablename__ = "lk_job_first_seen"
+
+    job_id = Column("job_id", BigInteger, primary_key = True)
+    first_seen_date = Column("first_seen_date", Date, nullable=False)
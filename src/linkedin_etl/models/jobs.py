@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DECIMAL, TEXT, BigInteger, DateTime
+from sqlalchemy import Column, Integer, String, DECIMAL, TEXT, BigInteger, DateTime, Index
 from sqlalchemy.sql import func
 from .base import Base
 
@@ -21,4 +21,16 @@ class Jobs(Base):
     etl_id = Column("etl_id", Integer)
     company_id = Column("company_id", Integer)
     created_at = Column("created_at", DateTime, default=func.now())
-    last_updated = Column("last_updated", DateTime, default=func.now())
\ No newline at end of file
+    last_updated = Column("last_updated", DateTime, default=func.now())
+
+    # Every dashboard query filters a last_updated range, the second column serves its join or filter
+    __table_args__ = (
+        Index("ix_lk_jobs_last_updated_job_id", "last_updated", "job_id"),
+        Index("ix_lk_jobs_etl_id_last_updated", "etl_id", "last_updated"),
+        Index("ix_lk_jobs_company_id_last_updated", "company_id", "last_updated"),
+        Index("ix_lk_jobs_job_experience_level_last_updated", "job_experience_level", "last_updated"),
+        # Backs the explorers' text search; ngram matches inside words like the old LIKE search.
+        # Created without InnoDB stopwords (see revision 6f3a9d2c8b15), rebuild it the same way
+        Index("ft_lk_jobs_search", "standardized_name", "job_name", "job_description",
+              mysql_prefix="FULLTEXT", mysql_with_parser="ngram"),
+    )
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, BigInteger, DateTime, DECIMAL
+from .base import Base
+
+class KpiSummary(Base):
+    __tablename__ = "lk_kpi_summary"
+
+    # Single row, always summary_id = 1
+    summary_id = Column("summary_id", Integer, primary_key = True, autoincrement = False)
+    last_load_ts = Column("last_load_ts", DateTime)
+    total_jobs = Column("total_jobs", BigInteger)
+    jobs_last_load = Column("jobs_last_load", BigInteger)
+    companies_last_load = Column("companies_last_load", BigInteger)
+    job_name_completeness = Column("job_name_completeness", DECIMAL(7,6))
+    job_url_completeness = Column("job_url_completeness", DECIMAL(7,6))
+    company_id_completeness = Column("company_id_completeness", DECIMAL(7,6))
+    job_description_completeness = Column("job_description_completeness", DECIMAL(7,6))
+    refreshed_at = Column("refreshed_at", DateTime)
@@ -1,14 +1,16 @@
-from sqlalchemy import Column, Integer, String, BigInteger, TEXT
+from sqlalchemy import Column, Integer, String, BigInteger, TEXT, CHAR
 from .base import Base
 
 class StagingCompanies(Base):
     __tablename__ = "lk_staging_companies"
 
     company_id = Column("company_id", BigInteger, primary_key = True)
+    etl_id = Column("etl_id", Integer, primary_key = True)
     company_name = Column("company_name", String(255))
     company_image_url = Column("company_image_url", TEXT)
     company_description = Column("company_description", TEXT)
     company_staff_count = Column("company_staff_count", Integer)
     company_url = Column("company_url", String(1000))
     company_follower_count = Column("company_follower_count", String(255))
-    company_industries = Column("company_industries",TEXT)
\ No newline at end of file
+    company_industries = Column("company_industries",TEXT)
+    content_hash = Column("content_hash", CHAR(32))
\ No newline at end of file
@@ -6,6 +6,7 @@ class StagingJobDetails(Base):
     __tablename__ = "lk_staging_job_details"
 
     job_id = Column("job_id", BigInteger, primary_key = True)
+    etl_id = Column("etl_id", Integer, primary_key = True)
     job_name = Column("job_name", String(1000))
     standardized_name = Column("standardized_name", String(255))
     job_url = Column("job_url", String(1000))
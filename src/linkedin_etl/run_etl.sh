@@ -20,7 +20,7 @@ source "$VENV/bin/activate"
 
 timestamp=$(date +"%Y-%m-%d_%H-%M-%S")
 $PYTHON -m pip install -U pip >/dev/null 2>&1 || true
-$PYTHON main.py >> "$LOGDIR/etl_$timestamp.log" 2>&1
+$PYTHON main.py "$@" >> "$LOGDIR/etl_$timestamp.log" 2>&1
 
 cd "$LOGDIR"
 ls -1t etl_*.log | tail -n +21 | xargs -r rm --
@@ -0,0 +1,29 @@
+class CompanyCache:
+    """Decides which company rows a config still has to write to companies.csv.
+
+    A company is emitted the first time the config sees it, unless its fingerprint
+    (content_hash plus follower count, the two values the merge compares) matches
+    the one already stored in lk_companies. Every later job of the same company is
+    skipped.
+
+    `known` maps company_id to the stored fingerprint. It is loaded once per run and
+    shared read-only between configs. Each config gets its own cache, so a config
+    that rolls back never hides a company from another config.
+    """
+    def __init__(self, known=None):
+        self._known = known if known is not None else {}
+        self._seen = set()
+
+    @staticmethod
+    def fingerprint(row):
+        return (row["content_hash"], str(row["company_follower_count"]))
+
+    def should_write(self, row):
+        company_id = int(row["company_id"])
+        if company_id in self._seen:
+            return False
+        self._seen.add(company_id)
+        return self._known.get(company_id) != self.fingerprint(row)
+
+    def __len__(self):
+        return len(self._seen)
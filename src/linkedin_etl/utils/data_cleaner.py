@@ -1,3 +1,5 @@
+import hashlib
+
 def _sanitize(value):
     """Make values safe for line-based CSV loading.
     - Remove internal newlines and carriage returns.
@@ -15,4 +17,9 @@ def _sanitize(value):
     return s.strip()
 
 def prep_row(raw: dict, columns: list[str]) -> dict:
-    return {col: _sanitize(raw.get(col)) for col in columns}
\ No newline at end of file
+    return {col: _sanitize(raw.get(col)) for col in columns}
+
+def content_hash(row: dict, columns: list[str]) -> str:
+    """Fingerprint of the prepared row values, used to skip unchanged rows on merge."""
+    payload = "\x1f".join(str(row.get(col, "")) for col in columns)
+    return hashlib.md5(payload.encode("utf-8")).hexdigest()
@@ -0,0 +1,168 @@
+import cProfile
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+
+# JSON lines: one "stage" event per finished stage and one "summary" per run
+METRICS_FILE = os.environ.get("METRICS_FILE", "logs/metrics.jsonl")
+# Optional node_exporter textfile collector target, rewritten at the end of every run
+PROMETHEUS_TEXTFILE = os.environ.get("PROMETHEUS_TEXTFILE")
+# Opt-in: one .prof file per stage (open with snakeviz or pstats)
+PROFILE_DIR = os.environ.get("PROFILE_DIR")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def to_dict(self):
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(list(self.buckets) + ["+Inf"], self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {"count": self.count, "sum": round(self.sum, 6), "buckets": buckets}
+
+class Metrics:
+    """Thread-safe counters and histograms for one ETL process.
+
+    Metrics are identified by name plus keyword labels, e.g.
+    METRICS.inc("http_responses_total", endpoint="detail", status=404).
+    """
+    def __init__(self, metrics_file=METRICS_FILE):
+        self.metrics_file = metrics_file
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.gauges = {}
+        self.started = time.time()
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+            self.histograms[key].observe(value)
+
+    def set_gauge(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.gauges[key] = value
+
+    @contextmanager
+    def timer(self, name, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def emit(self, event, **fields):
+        if not self.metrics_file:
+            return
+        line = json.dumps({"ts": round(time.time(), 3), "event": event, **fields}, default=str)
+        with self.lock:
+            Path(self.metrics_file).parent.mkdir(parents=True, exist_ok=True)
+            with open(self.metrics_file, "a", encoding="utf-8") as file:
+                file.write(line + "\n")
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(self.counters.items())
+                ],
+                "histograms": [
+                    {"name": name, "labels": dict(labels), **histogram.to_dict()}
+                    for (name, labels), histogram in sorted(self.histograms.items())
+                ],
+                "gauges": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(self.gauges.items())
+                ],
+            }
+
+    def to_prometheus(self):
+        def label_str(labels, extra=()):
+            pairs = [f'{k}="{v}"' for k, v in list(labels) + list(extra)]
+            return "{" + ",".join(pairs) + "}" if pairs else ""
+
+        lines = []
+        with self.lock:
+            for name in sorted({name for name, _ in self.counters}):
+                lines.append(f"# TYPE linkedin_etl_{name} counter")
+                for (metric, labels), value in sorted(self.counters.items()):
+                    if metric == name:
+                        lines.append(f"linkedin_etl_{name}{label_str(labels)} {value}")
+            for name in sorted({name for name, _ in self.gauges}):
+                lines.append(f"# TYPE linkedin_etl_{name} gauge")
+                for (metric, labels), value in sorted(self.gauges.items()):
+                    if metric == name:
+                        lines.append(f"linkedin_etl_{name}{label_str(labels)} {value}")
+            for name in sorted({name for name, _ in self.histograms}):
+                lines.append(f"# TYPE linkedin_etl_{name} histogram")
+                for (metric, labels), histogram in sorted(self.histograms.items()):
+                    if metric != name:
+                        continue
+                    for bound, cumulative in histogram.to_dict()["buckets"].items():
+                        lines.append(f"linkedin_etl_{name}_bucket{label_str(labels, [('le', bound)])} {cumulative}")
+                    lines.append(f"linkedin_etl_{name}_sum{label_str(labels)} {histogram.sum}")
+                    lines.append(f"linkedin_etl_{name}_count{label_str(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def flush(self, prometheus_textfile=PROMETHEUS_TEXTFILE):
+        self.emit("summary", duration_seconds=round(time.time() - self.started, 3), **self.snapshot())
+        if prometheus_textfile:
+            # The textfile collector may read at any time, publish it atomically
+            tmp_path = f"{prometheus_textfile}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                file.write(self.to_prometheus())
+            os.replace(tmp_path, prometheus_textfile)
+
+METRICS = Metrics()
+
+@contextmanager
+def stage(name, etl_id=None, profile_dir=PROFILE_DIR):
+    """Time a pipeline stage, emit it as a JSON line and optionally profile it.
+
+    cProfile only sees the calling thread, and only one profiler can be active
+    at a time, so with parallel configs some stages go unprofiled.
+    """
+    profiler = cProfile.Profile() if profile_dir else None
+    started = time.perf_counter()
+    status = "error"
+    if profiler:
+        try:
+            profiler.enable()
+        except ValueError:
+            profiler = None
+    try:
+        yield
+        status = "ok"
+    finally:
+        if profiler:
+            profiler.disable()
+            Path(profile_dir).mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(Path(profile_dir) / f"{etl_id}_{name}.prof")
+        elapsed = time.perf_counter() - started
+        METRICS.observe("stage_seconds", elapsed, stage=name)
+        METRICS.emit("stage", stage=name, etl_id=etl_id, status=status, seconds=round(elapsed, 3))
@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
 
-from utils.db import run_query
+from utils.db import run_query, get_data_version, query_cache_stats
 
 st.set_page_config(page_title="Portfolio Overview", page_icon="📊", layout="wide")
 
@@ -12,33 +12,19 @@ st.text("This dashboard aggregates public LinkedIn job posts for “Data Enginee
 st.divider()
 st.subheader("Main KPIs")
 
-# --- Core timestamps (no filters in Home) ---
-last_run_df = run_query("SELECT MAX(last_updated) AS last_ts FROM lk_jobs;")
-last_run_ts = pd.to_datetime(last_run_df["last_ts"].iloc[0]) if not last_run_df.empty else None
+# --- Every KPI comes from the single row the ETL refreshes after each run ---
+kpi_df = run_query("SELECT * FROM lk_kpi_summary WHERE summary_id = 1;")
+kpi = kpi_df.iloc[0] if not kpi_df.empty else None
+
+last_run_ts = pd.to_datetime(kpi["last_load_ts"]) if kpi is not None and pd.notna(kpi["last_load_ts"]) else None
 last_run_lbl = last_run_ts.strftime("%Y-%m-%d") if last_run_ts is not None else "—"
 
-# --- Totals (all history) ---
-total_jobs_df = run_query("SELECT COUNT(*) AS cnt FROM lk_jobs;")
-total_jobs = int(total_jobs_df["cnt"].iloc[0]) if not total_jobs_df.empty else 0
+def kpi_count(col: str) -> int:
+    return int(kpi[col]) if kpi is not None and pd.notna(kpi[col]) else 0
 
-# --- Jobs ingested in the last load (exact timestamp match) ---
-jobs_last_df = run_query(
-    "SELECT COUNT(*) AS cnt FROM lk_jobs WHERE last_updated = :ts;",
-    {"ts": last_run_ts} if last_run_ts is not None else {}
-)
-jobs_last_load = int(jobs_last_df["cnt"].iloc[0]) if not jobs_last_df.empty else 0
-
-# --- Companies with roles in the last load ---
-companies_df = run_query(
-    """
-    SELECT COUNT(DISTINCT company_id) AS companies
-    FROM lk_jobs
-    WHERE last_updated = :ts
-      AND company_id IS NOT NULL;
-    """,
-    {"ts": last_run_ts} if last_run_ts is not None else {}
-)
-companies_last_load = int(companies_df["companies"].iloc[0]) if not companies_df.empty else 0
+total_jobs = kpi_count("total_jobs")
+jobs_last_load = kpi_count("jobs_last_load")
+companies_last_load = kpi_count("companies_last_load")
 
 # --- ETL status (simple freshness rule) ---
 fresh_hours = ((pd.Timestamp.now() - last_run_ts).total_seconds() / 3600) if last_run_ts is not None else None
@@ -66,19 +52,23 @@ st.caption(
 st.divider()
 st.subheader("Mini Data Quality Panel")
 
-dq_df = run_query(
-    """
-    SELECT 'job_name' AS field, SUM(j.job_name IS NOT NULL)/COUNT(*) AS completeness FROM lk_jobs j
-    UNION ALL
-    SELECT 'job_url',    SUM(j.job_url IS NOT NULL)/COUNT(*) FROM lk_jobs j
-    UNION ALL
-    SELECT 'company_id', SUM(j.company_id IS NOT NULL)/COUNT(*) FROM lk_jobs j
-    UNION ALL
-    SELECT 'job_description', SUM(j.job_description IS NOT NULL)/COUNT(*) FROM lk_jobs j
-    """
+dq_df = pd.DataFrame(
+    [
+        {"field": field, "completeness": float(kpi[f"{field}_completeness"])}
+        for field in ("job_name", "job_url", "company_id", "job_description")
+        if pd.notna(kpi[f"{field}_completeness"])
+    ] if kpi is not None else [],
+    columns=["field", "completeness"],
 )
 if not dq_df.empty:
     dq_df["completeness"] = (dq_df["completeness"] * 100).round(1).astype(str) + "%"
     st.dataframe(dq_df.rename(columns={"field": "Field", "completeness": "Completeness"}), use_container_width=True, hide_index=True)
 else:
-    st.caption("No data-quality summary available yet.")
\ No newline at end of file
+    st.caption("No data-quality summary available yet.")
+
+# --- Query cache health (shared by every page and session) ---
+cache_stats = query_cache_stats()
+with st.sidebar.expander("Query cache"):
+    st.write(f"Data version: **{get_data_version()}**")
+    st.write(f"Entries: {cache_stats['entries']} / {cache_stats['max_entries']}")
+    st.write(f"Hits: {cache_stats['hits']:,} — misses: {cache_stats['misses']:,} ({cache_stats['hit_rate']:.0%} hit rate)")
@@ -0,0 +1 @@
+# Lets the tests import the app's modules (utils.*) the way the pages do
@@ -2,17 +2,18 @@ import datetime as dt
 import pandas as pd
 import streamlit as st
 import altair as alt
-from utils.db import run_query
+from utils.db import run_analytics_query
+from utils.query_builder import Filters, normalize_date_range
 
 st.set_page_config(page_title="Search Trends", page_icon="📈", layout="wide")
 
 # ---------- Options ----------
 cities_opts = (
-    run_query("SELECT DISTINCT city FROM lk_etl_status")["city"]
+    run_analytics_query("SELECT DISTINCT city FROM lk_etl_status")["city"]
     .dropna().astype(str).str.strip().replace("", pd.NA).dropna().drop_duplicates().tolist()
 )
 experience_opts = (
-    run_query("SELECT DISTINCT job_experience_level FROM lk_jobs")["job_experience_level"]
+    run_analytics_query("SELECT DISTINCT job_experience_level FROM lk_job_daily_rollup")["job_experience_level"]
     .dropna().astype(str).str.strip().replace("", pd.NA).dropna().drop_duplicates().tolist()
 )
 
@@ -35,24 +36,6 @@ if st.session_state.get("reset_filters", False):
 else:
     set_default_widget_state()
 
-# ---------- Helpers ----------
-def normalize_date_range(val, default_start, default_end):
-    if isinstance(val, (list, tuple)):
-        if len(val) == 2 and val[0] and val[1]:
-            a, b = val
-            return (min(a, b), max(a, b))
-        if len(val) == 1 and val[0]:
-            return (val[0], val[0])
-    if isinstance(val, dt.date):
-        return (val, val)
-    return (default_start, default_end)
-
-def expand_in(sql: str, name: str, values: list[str]):
-    if not values:
-        return sql, {}
-    placeholders = ", ".join(f":{name}{i}" for i in range(len(values)))
-    return sql.replace(f":{name}", f"({placeholders})"), {f"{name}{i}": v for i, v in enumerate(values)}
-
 # ---------- Filter Bar (form) ----------
 with st.form("filters_form"):
     c1, c2, c3 = st.columns(3)
@@ -76,48 +59,24 @@ start_date, end_date = normalize_date_range(
 cities_sel = st.session_state["cities_sel_input"]
 seniority_sel = st.session_state["seniority_sel_input"]
 
-# ---------- Derive timestamps ----------
-start_ts = dt.datetime.combine(start_date, dt.time.min)
-end_ts   = dt.datetime.combine(end_date, dt.time.max)
-
-# --- New vs Updated: GLOBAL (country = Switzerland), no city facet ---
-def expand_in(sql: str, name: str, values: list[str]):
-    if not values:
-        return sql, {}
-    placeholders = ", ".join(f":{name}{i}" for i in range(len(values)))
-    return sql.replace(f":{name}", f"({placeholders})"), {f"{name}{i}": v for i, v in enumerate(values)}
+# Same optional filters for every chart
+filters = (
+    Filters()
+    .where_in("r.city", "cities", cities_sel)
+    .where_in("r.job_experience_level", "seniority", seniority_sel)
+)
 
-base_sql_daily = """
-SELECT DATE(j.last_updated) AS d, s.city, COUNT(*) AS total_jobs
-FROM lk_jobs j
-LEFT JOIN lk_etl_status s ON s.etl_id = j.etl_id
-WHERE j.last_updated BETWEEN :start_ts AND :end_ts
-  {city_clause}
-  {sen_clause}
-GROUP BY DATE(j.last_updated), s.city
-ORDER BY d, s.city;
+# Every chart reads lk_job_daily_rollup, which the ETL keeps per (date, etl_id, city, experience level),
+# so the cost depends on the selected range and not on how much history lk_jobs holds
+sql_daily = f"""
+SELECT r.rollup_date AS d, NULLIF(r.city, '') AS city, SUM(r.job_count) AS total_jobs
+FROM lk_job_daily_rollup r
+WHERE r.rollup_date BETWEEN :start_d AND :end_d{filters.sql}
+GROUP BY r.rollup_date, r.city
+ORDER BY d, city;
 """
 
-params = {"start_ts": start_ts, "end_ts": end_ts}
-city_clause = ""
-sen_clause = ""
-
-sql = base_sql_daily
-if cities_sel:
-    city_clause = "AND s.city IN :cities"
-    sql, b1 = expand_in(sql.replace("{city_clause}", city_clause), "cities", cities_sel)
-    params.update(b1)
-else:
-    sql = sql.replace("{city_clause}", "")
-
-if seniority_sel:
-    sen_clause = "AND j.job_experience_level IN :seniority"
-    sql, b2 = expand_in(sql.replace("{sen_clause}", sen_clause), "seniority", seniority_sel)
-    params.update(b2)
-else:
-    sql = sql.replace("{sen_clause}", "")
-
-daily_df = run_query(sql, params)
+daily_df = run_analytics_query(sql_daily, filters.bind(start_d=start_date, end_d=end_date))
 
 st.subheader("Daily series by city")
 if not daily_df.empty:
@@ -139,35 +98,17 @@ else:
     st.caption("No data for the selected range/filters.")
 st.divider()
 
-sql_heat = """
-SELECT DAYOFWEEK(j.last_updated) AS weekday, s.city, COUNT(*) AS total_jobs
-FROM lk_jobs j
-LEFT JOIN lk_etl_status s ON s.etl_id = j.etl_id
-WHERE j.last_updated BETWEEN :start_ts AND :end_ts
-  {city_clause}
-  {sen_clause}
-GROUP BY weekday, s.city
-ORDER BY weekday, s.city;
-"""
-sql2 = sql_heat
-params2 = {"start_ts": start_ts, "end_ts": end_ts}
-
-if cities_sel:
-    sql2, b1h = expand_in(sql2.replace("{city_clause}", "AND s.city IN :cities"), "cities", cities_sel)
-    params2.update(b1h)
-else:
-    sql2 = sql2.replace("{city_clause}", "")
-if seniority_sel:
-    sql2, b2h = expand_in(sql2.replace("{sen_clause}", "AND j.job_experience_level IN :seniority"), "seniority", seniority_sel)
-    params2.update(b2h)
-else:
-    sql2 = sql2.replace("{sen_clause}", "")
-
-heat_df = run_query(sql2, params2)
+# Same rows as the daily series, summed per weekday instead of another query
+heat_df = pd.DataFrame(columns=["weekday", "city", "total_jobs"])
+if not daily_df.empty:
+    heat_df = (
+        daily_df.assign(weekday=pd.to_datetime(daily_df["d"]).dt.dayofweek)
+        .groupby(["weekday", "city"], as_index=False, dropna=False)["total_jobs"].sum()
+    )
 
 st.subheader("Weekday heatmap")
 if not heat_df.empty:
-    weekday_map = {1:"Sun",2:"Mon",3:"Tue",4:"Wed",5:"Thu",6:"Fri",7:"Sat"}
+    weekday_map = {0:"Mon",1:"Tue",2:"Wed",3:"Thu",4:"Fri",5:"Sat",6:"Sun"}
     order = ["Mon","Tue","Wed","Thu","Fri","Sat","Sun"]
     heat_df["weekday_name"] = pd.Categorical(heat_df["weekday"].map(weekday_map), categories=order, ordered=True)
     chart2 = (
@@ -185,51 +126,19 @@ else:
     st.caption("No data to build the heatmap.")
 st.divider()
 
-sql_nvu_global = """
-WITH first_seen AS (
-  SELECT j2.job_url, MIN(DATE(j2.last_updated)) AS first_seen_date
-  FROM lk_jobs j2
-  GROUP BY j2.job_url
-)
+sql_nvu_global = f"""
 SELECT
-  DATE(j.last_updated) AS d,
-  SUM(CASE WHEN fs.first_seen_date = DATE(j.last_updated) THEN 1 ELSE 0 END) AS new_jobs,
-  SUM(CASE WHEN fs.first_seen_date < DATE(j.last_updated) THEN 1 ELSE 0 END) AS updated_jobs
-FROM lk_jobs j
-JOIN first_seen fs ON fs.job_url = j.job_url
-LEFT JOIN lk_etl_status s ON s.etl_id = j.etl_id
-WHERE j.last_updated BETWEEN :start_ts AND :end_ts
-  AND s.country = :country
-  {city_clause}
-  {sen_clause}
-GROUP BY DATE(j.last_updated)
+  r.rollup_date AS d,
+  SUM(r.new_jobs) AS new_jobs,
+  SUM(r.updated_jobs) AS updated_jobs
+FROM lk_job_daily_rollup r
+WHERE r.rollup_date BETWEEN :start_d AND :end_d
+  AND r.country = :country{filters.sql}
+GROUP BY r.rollup_date
 ORDER BY d;
 """
 
-params3 = {
-    "start_ts": start_ts,
-    "end_ts": end_ts,
-    "country": "Switzerland",
-}
-
-sql3 = sql_nvu_global
-
-# filtros opcionales (NO afectan al grouping)
-if cities_sel:
-    sql3 = sql3.replace("{city_clause}", "AND s.city IN :cities")
-    sql3, b_c = expand_in(sql3, "cities", cities_sel)
-    params3.update(b_c)
-else:
-    sql3 = sql3.replace("{city_clause}", "")
-
-if seniority_sel:
-    sql3 = sql3.replace("{sen_clause}", "AND j.job_experience_level IN :seniority")
-    sql3, b_s = expand_in(sql3, "seniority", seniority_sel)
-    params3.update(b_s)
-else:
-    sql3 = sql3.replace("{sen_clause}", "")
-
-nvu_df = run_query(sql3, params3)
+nvu_df = run_analytics_query(sql_nvu_global, filters.bind(start_d=start_date, end_d=end_date, country="Switzerland"))
 
 st.subheader("New vs. updated (Switzerland)")
 if not nvu_df.empty:
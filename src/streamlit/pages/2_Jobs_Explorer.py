@@ -1,34 +1,19 @@
 # pages/2_Jobs_Explorer.py
 import datetime as dt
+import os
 import pandas as pd
 import streamlit as st
-from utils.db import run_query
+from utils.db import run_query, run_analytics_query
+from utils.export import EXPORT_FORMATS, export_query, delete_export
+from utils.query_builder import FULLTEXT_MATCH, Filters, canonical_values, fulltext_query, normalize_date_range
 
 st.set_page_config(page_title="Jobs Explorer", page_icon="🗂️", layout="wide")
 st.title("Jobs Explorer")
 st.caption("Filter, page through, and export the normalized job postings.")
 
-# -------------------- Helpers --------------------
-def normalize_date_range(val, default_start, default_end):
-    if isinstance(val, (list, tuple)):
-        if len(val) == 2 and val[0] and val[1]:
-            a, b = val
-            return (min(a, b), max(a, b))
-        if len(val) == 1 and val[0]:
-            return (val[0], val[0])
-    if isinstance(val, dt.date):
-        return (val, val)
-    return (default_start, default_end)
-
-def expand_in(sql: str, name: str, values: list[str]):
-    if not values:
-        return sql, {}
-    placeholders = ", ".join(f":{name}{i}" for i in range(len(values)))
-    return sql.replace(f":{name}", f"({placeholders})"), {f"{name}{i}": v for i, v in enumerate(values)}
-
 # -------------------- Options (from DB) --------------------
 exp_opts = (
-    run_query("SELECT DISTINCT job_experience_level FROM lk_jobs")["job_experience_level"]
+    run_analytics_query("SELECT DISTINCT job_experience_level FROM lk_job_daily_rollup")["job_experience_level"]
     .dropna().astype(str).str.strip().replace("", pd.NA).dropna().drop_duplicates().tolist()
 )
 
@@ -38,7 +23,8 @@ END_DEF = dt.date.today()
 START_DEF = END_DEF - dt.timedelta(days=30)
 
 # Inicializa estado (si no existe)
-st.session_state.setdefault("je_page", 1)
+# je_cursors holds the (last_updated, job_id) of the last row of every previous page
+st.session_state.setdefault("je_cursors", [])
 st.session_state.setdefault("je_page_size", 25)
 
 def _seed_widget_defaults():
@@ -52,7 +38,7 @@ if st.session_state.get("je_do_reset", False):
     for k in ("je_name_input", "je_date_range", "je_exp_levels"):
         st.session_state.pop(k, None)
     # Resetea paginación
-    st.session_state["je_page"] = 1
+    st.session_state["je_cursors"] = []
     st.session_state["je_page_size"] = 25
     # Re-semilla defaults
     _seed_widget_defaults()
@@ -65,7 +51,7 @@ else:
 with st.form("je_filters"):
     c1, c2, c3, c4 = st.columns([2, 2, 2, 1])
     # Importante: usa SOLO key= (sin value/default)
-    c1.text_input("Standardized name (substring match)", key="je_name_input", placeholder="e.g., data engineer")
+    c1.text_input("Search title, standardized name and description", key="je_name_input", placeholder="e.g., data engineer spark")
     c2.date_input("Date range (last_updated)", key="je_date_range")
     c3.multiselect("Experience level", options=exp_opts, key="je_exp_levels")
     new_page_size = c4.selectbox("Rows/page", options=[25, 50, 100, 250],
@@ -83,55 +69,73 @@ with st.form("je_filters"):
         # Si cambia el page size, actualiza y vuelve a página 1
         if new_page_size != st.session_state["je_page_size"]:
             st.session_state["je_page_size"] = new_page_size
-            st.session_state["je_page"] = 1
+            st.session_state["je_cursors"] = []
 
 # Lee filtros normalizados
 start_d, end_d = normalize_date_range(st.session_state["je_date_range"], START_DEF, END_DEF)
 start_ts = dt.datetime.combine(start_d, dt.time.min)
 end_ts   = dt.datetime.combine(end_d, dt.time.max)
-name_q = st.session_state["je_name_input"].strip()
+name_q = fulltext_query(st.session_state["je_name_input"])
 exp_sel = st.session_state["je_exp_levels"]
-page = st.session_state["je_page"]
 page_size = st.session_state["je_page_size"]
 
-# -------------------- WHERE builder --------------------
-where_clauses = ["j.last_updated BETWEEN :start_ts AND :end_ts"]
-params = {"start_ts": start_ts, "end_ts": end_ts}
-
-if name_q:
-    where_clauses.append("LOWER(j.standardized_name) LIKE :name_q")
-    params["name_q"] = f"%{name_q.lower()}%"
+# Cursors only make sense for the filters they were taken with
+filters_key = (start_d, end_d, name_q, canonical_values(exp_sel), page_size)
+if st.session_state.get("je_filters_key") != filters_key:
+    st.session_state["je_filters_key"] = filters_key
+    st.session_state["je_cursors"] = []
+cursors = st.session_state["je_cursors"]
+page = len(cursors) + 1
 
-if exp_sel:
-    where_clauses.append("j.job_experience_level IN :exp_levels")
-    # expand later
-where_sql = " AND ".join(where_clauses)
-
-# -------------------- COUNT (for pagination) --------------------
-count_sql = f"""
-SELECT COUNT(*) AS cnt
-FROM lk_jobs j
-LEFT JOIN lk_companies c ON c.company_id = j.company_id
-LEFT JOIN lk_etl_status s ON s.etl_id   = j.etl_id
-WHERE {where_sql}
+# -------------------- WHERE builder --------------------
+filters = (
+    Filters()
+    .where_if(name_q, f"{FULLTEXT_MATCH} AGAINST (:name_q IN BOOLEAN MODE)", name_q=name_q)
+    .where_in("j.job_experience_level", "exp_levels", exp_sel)
+)
+where_sql = f"j.last_updated BETWEEN :start_ts AND :end_ts{filters.sql}"
+params = filters.bind(start_ts=start_ts, end_ts=end_ts)
+
+# -------------------- Total (approximate) --------------------
+# Served from the daily rollup instead of a COUNT(*) over lk_jobs on every page render;
+# the rollup knows nothing about the text search, so with a search term this is an upper bound
+rollup_filters = Filters().where_in("r.job_experience_level", "exp_levels", exp_sel)
+approx_sql = f"""
+SELECT COALESCE(SUM(r.job_count), 0) AS cnt
+FROM lk_job_daily_rollup r
+WHERE r.rollup_date BETWEEN :start_d AND :end_d{rollup_filters.sql}
 """
+approx_params = rollup_filters.bind(start_d=start_d, end_d=end_d)
+total_rows = int(run_analytics_query(approx_sql, approx_params)["cnt"].iloc[0])
+total_is_exact = not name_q
+
+if name_q and st.checkbox("Exact count", key="je_exact_count", help="Runs a COUNT(*) over lk_jobs for the current filters"):
+    count_sql = f"""
+    SELECT COUNT(*) AS cnt
+    FROM lk_jobs j
+    WHERE {where_sql}
+    """
+    total_rows = int(run_query(count_sql, params)["cnt"].iloc[0])
+    total_is_exact = True
 
-count_params = params.copy()
-if exp_sel:
-    count_sql, bind_exp = expand_in(count_sql, "exp_levels", exp_sel)
-    count_params.update(bind_exp)
-
-total_rows = int(run_query(count_sql, count_params)["cnt"].iloc[0])
-
-# Ajusta página si está fuera de rango
 max_page = max(1, (total_rows + page_size - 1) // page_size)
-if page > max_page:
-    page = max_page
-    st.session_state["je_page"] = page
-
-offset = (page - 1) * page_size
 
 # -------------------- PAGE QUERY --------------------
+# A text search is ranked by relevance, otherwise the newest jobs come first.
+# Relevance is rounded so the cursor value compares equal when it comes back.
+if name_q:
+    sort_sql = f"ROUND({FULLTEXT_MATCH} AGAINST (:name_q IN BOOLEAN MODE), 6)"
+else:
+    sort_sql = "j.last_updated"
+
+# Keyset pagination: seek past the last row of the previous page on (sort key, job_id)
+# instead of scanning and discarding OFFSET rows
+seek_sql = ""
+page_params = params.copy() | {"limit": int(page_size) + 1}
+if cursors:
+    seek_sql = f"AND ({sort_sql} < :cursor_key OR ({sort_sql} = :cursor_key AND j.job_id < :cursor_id))"
+    page_params["cursor_key"], page_params["cursor_id"] = cursors[-1]
+
 page_sql = f"""
 SELECT
   j.job_id,
@@ -144,24 +148,26 @@ SELECT
   j.job_experience_level,
   j.created_at,
   s.city,
-  j.last_updated
+  j.last_updated,
+  {sort_sql} AS sort_key
 FROM lk_jobs j
 LEFT JOIN lk_companies c ON c.company_id = j.company_id
 LEFT JOIN lk_etl_status s ON s.etl_id   = j.etl_id
 WHERE {where_sql}
-ORDER BY j.last_updated DESC, j.job_id DESC
-LIMIT :limit OFFSET :offset
+  {seek_sql}
+ORDER BY sort_key DESC, j.job_id DESC
+LIMIT :limit
 """
 
-page_params = params.copy() | {"limit": int(page_size), "offset": int(offset)}
-if exp_sel:
-    page_sql, bind_exp2 = expand_in(page_sql, "exp_levels", exp_sel)
-    page_params.update(bind_exp2)
-
 df = run_query(page_sql, page_params)
 
+# One extra row tells whether a next page exists without counting
+has_next = len(df) > page_size
+df = df.iloc[:page_size]
+
 # -------------------- Render table (with clickable job_name) --------------------
-st.write(f"**Results:** {total_rows:,} rows — page {page} / {max_page}")
+total_lbl = f"{total_rows:,}" if total_is_exact else f"≈ up to {total_rows:,}"
+st.write(f"**Results:** {total_lbl} rows — page {page} / {max(max_page, page)}")
 
 if not df.empty:
     df = df.copy()
@@ -212,26 +218,28 @@ else:
 # -------------------- Pagination controls --------------------
 col_prev, col_mid, col_next = st.columns([1, 4, 1])
 with col_prev:
-    if st.button("← Prev", disabled=(page <= 1)):
-        st.session_state["je_page"] = max(1, page - 1)
+    if st.button("← Prev", disabled=not cursors):
+        st.session_state["je_cursors"] = cursors[:-1]
         st.rerun()
 with col_mid:
-    st.write(f"Page **{page}** of **{max_page}**")
+    st.write(f"Page **{page}** of **{max(max_page, page)}**")
 with col_next:
-    if st.button("Next →", disabled=(page >= max_page)):
-        st.session_state["je_page"] = min(max_page, page + 1)
+    if st.button("Next →", disabled=not has_next):
+        last_row = df.iloc[-1]
+        if name_q:
+            cursor_key = float(last_row["sort_key"])
+        else:
+            cursor_key = pd.Timestamp(last_row["sort_key"]).to_pydatetime()
+        next_cursor = (cursor_key, int(last_row["job_id"]))
+        st.session_state["je_cursors"] = cursors + [next_cursor]
         st.rerun()
 
-# Reset page to 1 when filters change (simple heuristic)
-if (apply_clicked and st.session_state["je_page"] != 1):
-    st.session_state["je_page"] = 1
-    st.rerun()
-
 st.divider()
 
-# -------------------- Export CSV (full filtered result) --------------------
-# Tope de filas a exportar para no “reventar” la app; ajusta según convenga:
-EXPORT_LIMIT = 50000
+# -------------------- Export (full filtered result, on demand) --------------------
+# Nothing runs until "Prepare export" is clicked; rows are streamed from a server-side
+# cursor into a temp file chunk by chunk, so the cap is only a safety net
+EXPORT_LIMIT = 1000000
 
 export_sql = f"""
 SELECT
@@ -249,20 +257,35 @@ FROM lk_jobs j
 LEFT JOIN lk_companies c ON c.company_id = j.company_id
 LEFT JOIN lk_etl_status s ON s.etl_id   = j.etl_id
 WHERE {where_sql}
-ORDER BY j.last_updated DESC, j.job_id DESC
+ORDER BY {sort_sql} DESC, j.job_id DESC
 LIMIT :limit
 """
 
 export_params = params.copy() | {"limit": int(EXPORT_LIMIT)}
-if exp_sel:
-    export_sql, exp_bind = expand_in(export_sql, "exp_levels", exp_sel)
-    export_params.update(exp_bind)
-
-export_df = run_query(export_sql, export_params)
 
-st.download_button(
-    label=f"Download CSV (filtered, up to {EXPORT_LIMIT:,} rows)",
-    data=export_df.to_csv(index=False).encode("utf-8"),
-    file_name=f"jobs_filtered_{start_d}_{end_d}.csv",
-    mime="text/csv",
-)
+col_fmt, col_prep = st.columns([2, 1])
+export_format = col_fmt.selectbox("Export format", options=list(EXPORT_FORMATS), key="je_export_format")
+export_key = (filters_key, export_format)
+
+if col_prep.button(f"Prepare export (up to {EXPORT_LIMIT:,} rows)"):
+    old_export = st.session_state.pop("je_export", None)
+    if old_export:
+        delete_export(old_export["path"])
+    with st.spinner("Exporting..."):
+        path, rows = export_query(export_sql, export_params, export_format)
+    st.session_state["je_export"] = {"key": export_key, "path": path, "rows": rows}
+
+export = st.session_state.get("je_export")
+if export and not os.path.isfile(export["path"]):
+    # Purged after EXPORT_MAX_AGE, it has to be prepared again
+    st.session_state.pop("je_export")
+    export = None
+if export and export["key"] == export_key:
+    suffix, mime = EXPORT_FORMATS[export_format]
+    with open(export["path"], "rb") as export_file:
+        st.download_button(
+            label=f"Download {export_format} ({export['rows']:,} rows)",
+            data=export_file,
+            file_name=f"jobs_filtered_{start_d}_{end_d}{suffix}",
+            mime=mime,
+        )
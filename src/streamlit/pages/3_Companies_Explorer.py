@@ -2,30 +2,14 @@ import datetime as dt
 import re
 import pandas as pd
 import streamlit as st
-from utils.db import run_query
+from utils.db import run_query, run_analytics_query
+from utils.query_builder import FULLTEXT_MATCH, Filters, fulltext_query, normalize_date_range
 
 st.set_page_config(page_title="Companies Explorer", page_icon="🏢", layout="wide")
 st.title("Companies Explorer")
 st.caption("Top companies by open roles (in the selected period), with followers and industries. Click a card to drill down to its jobs.")
 
 # -------------------- Helpers --------------------
-def normalize_date_range(val, default_start, default_end):
-    if isinstance(val, (list, tuple)):
-        if len(val) == 2 and val[0] and val[1]:
-            a, b = val
-            return (min(a, b), max(a, b))
-        if len(val) == 1 and val[0]:
-            return (val[0], val[0])
-    if isinstance(val, dt.date):
-        return (val, val)
-    return (default_start, default_end)
-
-def expand_in(sql: str, name: str, values: list[str]):
-    if not values:
-        return sql, {}
-    placeholders = ", ".join(f":{name}{i}" for i in range(len(values)))
-    return sql.replace(f":{name}", f"({placeholders})"), {f"{name}{i}": v for i, v in enumerate(values)}
-
 def parse_followers_val(s: str | None) -> int | None:
     if s is None:
         return None
@@ -70,7 +54,7 @@ def short_industries(txt: str | None, max_items: int = 2) -> str:
 
 # -------------------- Options (from DB) --------------------
 cities_opts = (
-    run_query("SELECT DISTINCT city FROM lk_etl_status")["city"]
+    run_analytics_query("SELECT DISTINCT city FROM lk_etl_status")["city"]
     .dropna().astype(str).str.strip().replace("", pd.NA).dropna().drop_duplicates().tolist()
 )
 
@@ -99,7 +83,7 @@ else:
 # -------------------- Filter bar (form) --------------------
 with st.form("ce_filters"):
     c0, c1, c2, c3 = st.columns([2, 2, 2, 1])
-    c0.text_input("Standardized name contains", key="ce_stdname", placeholder="e.g., data engineer")  # <-- NUEVO
+    c0.text_input("Jobs matching (title, name, description)", key="ce_stdname", placeholder="e.g., data engineer spark")  # <-- NUEVO
     c1.date_input("Date range (last_updated)", key="ce_date_range")
     c2.multiselect("Cities", options=cities_opts, key="ce_cities")
     new_top_n = c3.selectbox("Cards to show", options=[12, 24, 36, 48],
@@ -122,11 +106,18 @@ start_d, end_d = normalize_date_range(st.session_state["ce_date_range"], START_D
 start_ts = dt.datetime.combine(start_d, dt.time.min)
 end_ts   = dt.datetime.combine(end_d, dt.time.max)
 cities_sel = st.session_state["ce_cities"]
-std_q = st.session_state["ce_stdname"].strip().lower()   # <-- NUEVO
+std_q = fulltext_query(st.session_state["ce_stdname"])   # <-- NUEVO
 TOP_N = st.session_state["ce_top_n"]
 
+# Shared by the top companies and the drill-down below
+filters = (
+    Filters()
+    .where_in("s.city", "cities", cities_sel)
+    .where_if(std_q, f"{FULLTEXT_MATCH} AGAINST (:std_q IN BOOLEAN MODE)", std_q=std_q)
+)
+
 # -------------------- Query: Top companies --------------------
-base_sql = f"""
+sql = f"""
 SELECT
   c.company_id,
   c.company_name,
@@ -138,31 +129,16 @@ SELECT
 FROM lk_jobs j
 JOIN lk_companies c ON c.company_id = j.company_id
 LEFT JOIN lk_etl_status s ON s.etl_id = j.etl_id
-WHERE j.last_updated BETWEEN :start_ts AND :end_ts
-  {{city_clause}}
-  {{std_clause}}
+WHERE j.last_updated BETWEEN :start_ts AND :end_ts{filters.sql}
 GROUP BY
   c.company_id, c.company_name, c.company_url, c.company_image_url,
   c.company_follower_count, c.company_industries
 ORDER BY vacancies DESC, c.company_name ASC
 LIMIT :limit
 """
-params = {"start_ts": start_ts, "end_ts": end_ts, "limit": int(TOP_N)}
-sql = base_sql
-if cities_sel:
-    sql = sql.replace("{city_clause}", "AND s.city IN :cities")
-    sql, bind = expand_in(sql, "cities", cities_sel)
-    params.update(bind)
-else:
-    sql = sql.replace("{city_clause}", "")
-
-if std_q:
-    sql = sql.replace("{std_clause}", "AND LOWER(j.standardized_name) LIKE :std_q")
-    params["std_q"] = f"%{std_q}%"
-else:
-    sql = sql.replace("{std_clause}", "")
-
-top_df = run_query(sql, params)
+params = filters.bind(start_ts=start_ts, end_ts=end_ts, limit=int(TOP_N))
+# The snapshot has no job descriptions (nor FULLTEXT), a text search stays on MySQL
+top_df = run_query(sql, params) if std_q else run_analytics_query(sql, params)
 
 # Parse followers to numeric for display/sorting consistency
 if not top_df.empty:
@@ -207,7 +183,8 @@ if company_id is not None:
     comp_name = nm_df["company_name"].iloc[0] if not nm_df.empty else f""
 
     st.subheader(f"Jobs at {comp_name}")
-    # Query jobs for the selected company (same date range + cities)
+    # Query jobs for the selected company (same date range + cities), best matches first when searching
+    order_sql = f"{FULLTEXT_MATCH} AGAINST (:std_q IN BOOLEAN MODE) DESC, " if std_q else ""
     jobs_sql = f"""
     SELECT
       j.job_name,
@@ -224,26 +201,11 @@ if company_id is not None:
     JOIN lk_companies c ON c.company_id = j.company_id
     LEFT JOIN lk_etl_status s ON s.etl_id = j.etl_id
     WHERE j.last_updated BETWEEN :start_ts AND :end_ts
-      AND j.company_id = :cid
-      {{city_clause}}
-      {{std_clause}}
-    ORDER BY j.last_updated DESC, j.job_id DESC
+      AND j.company_id = :cid{filters.sql}
+    ORDER BY {order_sql}j.last_updated DESC, j.job_id DESC
     LIMIT 2000
     """
-    params_jobs = {"start_ts": start_ts, "end_ts": end_ts, "cid": int(company_id)}
-    if cities_sel:
-        jobs_sql = jobs_sql.replace("{city_clause}", "AND s.city IN :cities")
-        jobs_sql, bind2 = expand_in(jobs_sql, "cities", cities_sel)
-        params_jobs.update(bind2)
-    else:
-        jobs_sql = jobs_sql.replace("{city_clause}", "")
-
-    if std_q:
-        jobs_sql = jobs_sql.replace("{std_clause}", "AND LOWER(j.standardized_name) LIKE :std_q")
-        params_jobs["std_q"] = f"%{std_q}%"
-    else:
-        jobs_sql = jobs_sql.replace("{std_clause}", "")
-
+    params_jobs = filters.bind(start_ts=start_ts, end_ts=end_ts, cid=int(company_id))
     jobs_df = run_query(jobs_sql, params_jobs)
 
     if jobs_df.empty:
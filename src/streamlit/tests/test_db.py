@@ -0,0 +1,24 @@
+from utils.db import to_duckdb
+
+
+def test_to_duckdb_rewrites_named_params():
+    sql, params = to_duckdb("SELECT * FROM lk_jobs j WHERE j.etl_id = :etl_id AND j.job_views >= :views",
+                            {"etl_id": 3, "views": 10})
+    assert sql == "SELECT * FROM lk_jobs j WHERE j.etl_id = $etl_id AND j.job_views >= $views"
+    assert params == {"etl_id": 3, "views": 10}
+
+
+def test_to_duckdb_spreads_list_params():
+    sql, params = to_duckdb("SELECT * FROM lk_etl_status s WHERE s.city IN :cities", {"cities": ("Basel", "Bern")})
+    assert sql == "SELECT * FROM lk_etl_status s WHERE s.city IN ($cities0, $cities1)"
+    assert params == {"cities0": "Basel", "cities1": "Bern"}
+
+
+def test_to_duckdb_leaves_casts_and_quoted_text_alone():
+    sql = (
+        "SELECT CAST(j.last_updated AS DATE)::VARCHAR, TIME '10:30:00' AS t, 'it''s :not_a_param' AS s, "
+        "\"col:name\" FROM lk_jobs j WHERE j.etl_id = :etl_id"
+    )
+    duck_sql, params = to_duckdb(sql, {"etl_id": 1})
+    assert duck_sql == sql.replace(":etl_id", "$etl_id")
+    assert params == {"etl_id": 1}
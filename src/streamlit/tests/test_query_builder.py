@@ -0,0 +1,106 @@
+import datetime as dt
+
+from sqlalchemy.dialects import mysql
+
+from utils.db import _cache_key, prepare
+from utils.query_builder import Filters, canonical_values, fulltext_query, normalize_date_range
+
+BASE_SQL = "SELECT COUNT(*) FROM lk_jobs j WHERE j.last_updated BETWEEN :start_ts AND :end_ts"
+START = dt.datetime(2026, 1, 1)
+END = dt.datetime(2026, 1, 31, 23, 59, 59)
+
+
+def build(cities, levels=None, min_views=None):
+    filters = (
+        Filters()
+        .where_in("s.city", "cities", cities)
+        .where_in("j.job_experience_level", "levels", levels)
+        .where_if(min_views is not None, "j.job_views >= :min_views", min_views=min_views)
+    )
+    return BASE_SQL + filters.sql, filters.bind(start_ts=START, end_ts=END)
+
+
+def compile_mysql(sql, params):
+    statement = prepare(sql, params).bindparams(**params)
+    return statement.compile(dialect=mysql.dialect(), compile_kwargs={"render_postcompile": True})
+
+
+def test_canonical_values_sorts_and_deduplicates():
+    assert canonical_values(["Zurich", "Basel", "Zurich", None, "Bern"]) == ("Basel", "Bern", "Zurich")
+    assert canonical_values([]) == ()
+
+
+def test_canonical_values_orders_mixed_types_by_their_text():
+    assert canonical_values([10, "2", 1]) == (1, 10, "2")
+
+
+def test_where_in_with_shuffled_or_duplicated_values_gives_the_same_query():
+    first = build(["Zurich", "Basel", "Bern"], ["Associate"])
+    second = build(["Bern", "Zurich", "Basel", "Zurich"], ["Associate", "Associate"])
+    assert first == second
+    assert _cache_key(1, *first) == _cache_key(1, *second)
+
+
+def test_where_in_uses_a_single_parameter_whatever_the_selection_size():
+    one_sql, one_params = build(["Zurich"])
+    three_sql, three_params = build(["Zurich", "Basel", "Bern"])
+    assert one_sql == three_sql
+    assert one_sql.endswith("\n  AND s.city IN :cities")
+    assert one_params["cities"] == ("Zurich",)
+    assert three_params["cities"] == ("Basel", "Bern", "Zurich")
+
+
+def test_empty_selections_add_no_predicate():
+    for cities in ([], None, [None]):
+        sql, params = build(cities, [])
+        assert sql == BASE_SQL
+        assert params == {"start_ts": START, "end_ts": END}
+
+
+def test_where_if_only_adds_the_clause_when_the_condition_holds():
+    sql, params = build([], min_views=100)
+    assert sql == BASE_SQL + "\n  AND j.job_views >= :min_views"
+    assert params["min_views"] == 100
+
+    sql, params = build([], min_views=None)
+    assert sql == BASE_SQL
+    assert "min_views" not in params
+
+
+def test_bind_lets_filter_params_win_over_the_base_params():
+    filters = Filters().where("j.etl_id = :etl_id", etl_id=2)
+    assert filters.bind(etl_id=1, limit=10) == {"etl_id": 2, "limit": 10}
+
+
+def test_prepare_binds_lists_as_one_expanding_parameter():
+    sql, params = build(["Zurich", "Basel"], ["Associate", "Director", "Internship"])
+    statement = prepare(sql, params)
+    assert statement._bindparams["cities"].expanding
+    assert statement._bindparams["levels"].expanding
+    assert not statement._bindparams["start_ts"].expanding
+
+    compiled = compile_mysql(sql, params)
+    assert "s.city IN (%s, %s)" in str(compiled)
+    assert "j.job_experience_level IN (%s, %s, %s)" in str(compiled)
+
+
+def test_prepare_keeps_the_statement_text_independent_of_the_list_length():
+    short_sql, short_params = build(["Zurich"])
+    long_sql, long_params = build(["Zurich", "Basel", "Bern", "Geneva"])
+    assert str(prepare(short_sql, short_params)) == str(prepare(long_sql, long_params))
+
+
+def test_prepare_without_params_leaves_the_statement_alone():
+    assert str(prepare(BASE_SQL)) == BASE_SQL
+
+
+def test_fulltext_query_requires_every_word():
+    assert fulltext_query("Data  engineer (m/w)") == '+"Data" +"engineer" +"m" +"w"'
+    assert fulltext_query("  --  ") == ""
+
+
+def test_normalize_date_range_orders_the_bounds():
+    default = (dt.date(2026, 1, 1), dt.date(2026, 1, 31))
+    assert normalize_date_range((dt.date(2026, 1, 9), dt.date(2026, 1, 3)), *default) == (dt.date(2026, 1, 3), dt.date(2026, 1, 9))
+    assert normalize_date_range((dt.date(2026, 1, 3),), *default) == (dt.date(2026, 1, 3), dt.date(2026, 1, 3))
+    assert normalize_date_range(None, *default) == default
@@ -1,7 +1,19 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, text, bindparam
+from sqlalchemy.sql.elements import TextClause
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
 from sqlalchemy.engine import Engine, URL
 
 @st.cache_resource
@@ -24,14 +36,159 @@ def get_engine() -> Engine:
         pool_recycle=1800
     )
 
-@st.cache_data(ttl=600)
-def run_query(sql: str, params: dict = None) -> pd.DataFrame:
+# How often the published data version is re-read, i.e. the worst-case staleness after an ETL run
+DATA_VERSION_TTL = int(os.environ.get("DATA_VERSION_TTL", 30))
+QUERY_CACHE_SIZE = int(os.environ.get("QUERY_CACHE_SIZE", 256))
+
+# "duckdb" serves run_analytics_query from the Parquet snapshot the ETL publishes
+# in ANALYTICS_SNAPSHOT_DIR, "mysql" sends everything to the primary database
+ANALYTICS_BACKEND = os.environ.get("ANALYTICS_BACKEND", "mysql")
+ANALYTICS_SNAPSHOT_DIR = os.environ.get("ANALYTICS_SNAPSHOT_DIR", "")
+SNAPSHOT_TABLES = ("lk_jobs", "lk_companies", "lk_etl_status", "lk_job_daily_rollup")
+
+class QueryCache:
+    """Bounded LRU of query results, shared by every session of the app.
+
+    Entries are keyed on the data version, so a new ETL run makes them unreachable
+    and the LRU ages them out; nothing expires on a timer.
+    """
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            df = self.entries.get(key)
+            if df is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return df
+
+    def put(self, key, df: pd.DataFrame):
+        with self.lock:
+            self.entries[key] = df
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+@st.cache_resource
+def get_query_cache() -> QueryCache:
+    return QueryCache(QUERY_CACHE_SIZE)
+
+@st.cache_data(ttl=DATA_VERSION_TTL)
+def get_data_version() -> int:
     eng = get_engine()
     with eng.connect() as con:
-        return pd.read_sql(text(sql), con=con, params=params or {})
+        return con.execute(text("SELECT COALESCE(MAX(version), 0) FROM lk_data_version")).scalar()
+
+def _cache_key(version, sql: str, params: dict):
+    return (version, sql, tuple(sorted((k, repr(v)) for k, v in (params or {}).items())))
+
+def prepare(sql: str, params: dict = None) -> TextClause:
+    # List params become one expanding IN parameter, so the statement text
+    # (and SQLAlchemy's compiled cache entry) does not depend on the list length
+    expanding = [bindparam(k, expanding=True) for k, v in (params or {}).items() if isinstance(v, (list, tuple))]
+    return text(sql).bindparams(*expanding)
+
+def run_query(sql: str, params: dict = None) -> pd.DataFrame:
+    cache = get_query_cache()
+    key = _cache_key(get_data_version(), sql, params)
+    df = cache.get(key)
+    if df is None:
+        eng = get_engine()
+        with eng.connect() as con:
+            df = pd.read_sql(prepare(sql, params), con=con, params=params or {})
+        cache.put(key, df)
+    # Pages add/convert columns in place, the cached frame must stay untouched
+    return df.copy()
+
+@st.cache_data(ttl=DATA_VERSION_TTL)
+def get_snapshot_name() -> str | None:
+    current = Path(ANALYTICS_SNAPSHOT_DIR) / "CURRENT"
+    if not ANALYTICS_SNAPSHOT_DIR or not current.is_file():
+        return None
+    return current.read_text().strip() or None
+
+@st.cache_resource(max_entries=2)
+def get_duckdb(snapshot_name: str):
+    # In-memory database with one view per snapshot table, the Parquet files stay on disk
+    con = duckdb.connect()
+    snapshot = Path(ANALYTICS_SNAPSHOT_DIR) / snapshot_name
+    for table_name in SNAPSHOT_TABLES:
+        files = (snapshot / table_name / "**" / "*.parquet").as_posix()
+        con.execute(f"CREATE VIEW {table_name} AS SELECT * FROM read_parquet('{files}', hive_partitioning = true)")
+    return con
+
+def to_duckdb(sql: str, params: dict = None):
+    """Rewrite :name parameters to DuckDB's $name, spreading list params over $name0, $name1..."""
+    params = params or {}
+    duck_params = {}
+
+    def replace(match):
+        name = match.group(1)
+        if name is None:
+            # A quoted literal or identifier, e.g. TIME '00:00:00', is left as is
+            return match.group(0)
+        value = params[name]
+        if isinstance(value, (list, tuple)):
+            names = [f"{name}{i}" for i in range(len(value))]
+            duck_params.update(zip(names, value))
+            return "(" + ", ".join(f"${n}" for n in names) + ")"
+        duck_params[name] = value
+        return f"${name}"
+
+    return re.sub(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|(?<![:\w]):(\w+)", replace, sql), duck_params
+
+def run_analytics_query(sql: str, params: dict = None) -> pd.DataFrame:
+    """Like run_query, for read-only aggregations that the snapshot can answer.
+
+    Falls back to MySQL when the DuckDB backend is off, duckdb is missing or no snapshot exists yet.
+    """
+    snapshot_name = get_snapshot_name() if ANALYTICS_BACKEND == "duckdb" and duckdb is not None else None
+    if snapshot_name is None:
+        return run_query(sql, params)
+
+    cache = get_query_cache()
+    key = _cache_key(f"duckdb:{snapshot_name}", sql, params)
+    df = cache.get(key)
+    if df is None:
+        duck_sql, duck_params = to_duckdb(sql, params)
+        # A cursor is a separate connection to the same database, safe to use from this session's thread
+        with get_duckdb(snapshot_name).cursor() as cur:
+            df = cur.execute(duck_sql, duck_params).df()
+        cache.put(key, df)
+    return df.copy()
+
+def query_cache_stats() -> dict:
+    return get_query_cache().stats()
 
 def execute(sql: str, params: dict = None) -> int:
     eng = get_engine()
     with eng.begin() as con:
         res = con.execute(text(sql), params or {})
         return res.rowcount
+
+def stream_query(sql: str, params: dict = None, chunksize: int = 10000):
+    """Yield DataFrames of up to `chunksize` rows from a server-side cursor.
+
+    Not cached: meant for large one-off reads such as exports.
+    """
+    eng = get_engine()
+    with eng.connect().execution_options(stream_results=True) as con:
+        yield from pd.read_sql(prepare(sql, params), con=con, params=params or {}, chunksize=chunksize)
@@ -0,0 +1,77 @@
+import gzip
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from utils.db import stream_query
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# Abandoned sessions never delete their export, files older than this are purged before each new one
+EXPORT_DIR = Path(os.environ.get("EXPORT_DIR", Path(tempfile.gettempdir()) / "linkedin_exports"))
+EXPORT_MAX_AGE = int(os.environ.get("EXPORT_MAX_AGE", 3600))
+
+EXPORT_FORMATS = {
+    "CSV": (".csv", "text/csv"),
+    "CSV (gzip)": (".csv.gz", "application/gzip"),
+}
+if pa is not None:
+    EXPORT_FORMATS["Parquet"] = (".parquet", "application/vnd.apache.parquet")
+
+def purge_stale_exports(max_age: int = EXPORT_MAX_AGE):
+    cutoff = time.time() - max_age
+    for path in EXPORT_DIR.glob("export-*"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except FileNotFoundError:
+            # Purged concurrently by another session
+            pass
+
+def _parquet_schema(table):
+    # A column that is all NULL in the first chunk is inferred as the null type, which later
+    # chunks holding values cannot be cast to; such columns are written as strings
+    return pa.schema(
+        [field.with_type(pa.string()) if pa.types.is_null(field.type) else field for field in table.schema],
+        metadata=table.schema.metadata,
+    )
+
+def export_query(sql: str, params: dict, export_format: str, chunksize: int = 10000):
+    """Stream a query into a temporary file and return (path, rows).
+
+    Only one chunk is held in memory at a time, the file is what gets downloaded.
+    """
+    suffix, _ = EXPORT_FORMATS[export_format]
+    EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    purge_stale_exports()
+    with tempfile.NamedTemporaryFile(prefix="export-", suffix=suffix, dir=EXPORT_DIR, delete=False) as tmp:
+        path = tmp.name
+
+    rows = 0
+    if export_format == "Parquet":
+        writer = None
+        for chunk in stream_query(sql, params, chunksize):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, _parquet_schema(table))
+            writer.write_table(table.cast(writer.schema))
+            rows += len(chunk)
+        if writer is not None:
+            writer.close()
+        return path, rows
+
+    opener = gzip.open if export_format == "CSV (gzip)" else open
+    with opener(path, "wt", encoding="utf-8", newline="") as file:
+        for i, chunk in enumerate(stream_query(sql, params, chunksize)):
+            chunk.to_csv(file, index=False, header=(i == 0))
+            rows += len(chunk)
+    return path, rows
+
+def delete_export(path: str):
+    if os.path.isfile(path):
+        os.remove(path)
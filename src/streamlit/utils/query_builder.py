@@ -0,0 +1,59 @@
+import datetime as dt
+
+def normalize_date_range(val, default_start, default_end):
+    if isinstance(val, (list, tuple)):
+        if len(val) == 2 and val[0] and val[1]:
+            a, b = val
+            return (min(a, b), max(a, b))
+        if len(val) == 1 and val[0]:
+            return (val[0], val[0])
+    if isinstance(val, dt.date):
+        return (val, val)
+    return (default_start, default_end)
+
+# Must list the same columns as the ft_lk_jobs_search FULLTEXT index
+FULLTEXT_MATCH = "MATCH(j.standardized_name, j.job_name, j.job_description)"
+
+def fulltext_query(text: str) -> str:
+    # Every word is required; quoting it makes the ngram parser match its n-grams in sequence
+    words = [w for w in "".join(ch if ch.isalnum() else " " for ch in text).split() if w]
+    return " ".join(f'+"{w}"' for w in words)
+
+def canonical_values(values) -> tuple:
+    # Order and duplicates in a multiselect must not change the query or its cache key
+    return tuple(sorted({v for v in values if v is not None}, key=str))
+
+class Filters:
+    """Optional WHERE conditions rendered to a stable SQL text.
+
+    Each condition always uses the same parameter name and IN lists are bound as a
+    single expanding parameter (see utils.db.prepare), so any selection of cities
+    produces the same statement and only the canonicalized params differ.
+    """
+    def __init__(self):
+        self.clauses = []
+        self.params = {}
+
+    def where(self, clause: str, **params) -> "Filters":
+        self.clauses.append(clause)
+        self.params.update(params)
+        return self
+
+    def where_in(self, column: str, name: str, values) -> "Filters":
+        values = canonical_values(values or [])
+        if values:
+            self.where(f"{column} IN :{name}", **{name: values})
+        return self
+
+    def where_if(self, condition, clause: str, **params) -> "Filters":
+        if condition:
+            self.where(clause, **params)
+        return self
+
+    @property
+    def sql(self) -> str:
+        # Meant to follow a fixed WHERE condition, e.g. "WHERE j.last_updated BETWEEN ... {filters.sql}"
+        return "".join(f"\n  AND {clause}" for clause in self.clauses)
+
+    def bind(self, **params) -> dict:
+        return params | self.params